@@ -1,12 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException
 
 from app.core.db import AsyncSession, get_db
-from app.schemas.auth_schemas import TokenResponseSchema
+from app.schemas.auth_schemas import RefreshTokenSchema, TokenResponseSchema
 from app.schemas.user_schema import UserLoginSchema
 from app.services.auth_service import (
     authenticate_user,
     create_access_token,
     create_refresh_token,
+    refresh_tokens,
 )
 
 router = APIRouter()
@@ -26,3 +27,13 @@ async def login(
     access_token = create_access_token(user_db.id)
     refresh_token = create_refresh_token(user_db.id)
     return {"access_token": access_token, "refresh_token": refresh_token}
+
+
+@router.post("/jwt/refresh", response_model=TokenResponseSchema)
+async def refresh(
+    token_data: RefreshTokenSchema, db: AsyncSession = Depends(get_db)
+) -> dict[str, str]:
+    """
+    Exchanges a refresh token for a new access token, rotating the refresh token if enabled.
+    """
+    return await refresh_tokens(token_data.refresh_token, db)
@@ -1,30 +1,101 @@
-from typing import Any, List, Sequence
+from typing import Any, List
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.engine.row import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.db import get_db
-from app.schemas.author_schema import AuthorCreate, AuthorResponse
+from app.core.etag import etag_matches, make_etag, not_modified
+from app.schemas.author_schema import (
+    AuthorCreate,
+    AuthorDetailResponse,
+    AuthorListItemResponse,
+    AuthorResponse,
+)
 from app.services.author_service import AuthorService
+from app.services.book_service import BookService
 
 router = APIRouter()
 
+INCLUDE_PATTERN = "^(books|book_count)(,(books|book_count))*$"
 
-@router.get("/", response_model=List[AuthorResponse])
-async def get_all_authors(db: AsyncSession = Depends(get_db)) -> Sequence[Row[Any]]:
+
+@router.get("/", response_model=List[AuthorListItemResponse], response_model_exclude_none=True)
+async def get_all_authors(
+    request: Request,
+    response: Response,
+    name: str = Query(None, description="Case-sensitive name prefix"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=100),
+    sort_by: str = Query("name", pattern="^(name|id)$"),
+    sort_order: str = Query("asc", pattern="^(asc|desc)$"),
+    pagination: str = Query("offset", pattern="^(offset|cursor)$"),
+    cursor: str = Query(None),
+    include_biography: bool = Query(True),
+    include: str = Query(None, pattern=INCLUDE_PATTERN),
+    books_limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+) -> Any:
     """
-    Retrieves a list of all authors from the database.
+    Retrieves a page of authors with an optional name-prefix filter, pagination, and sorting.
+    With `pagination=cursor` the page is located by the `cursor` from the previous
+    response's `X-Next-Cursor` header instead of `page`. `include=books,book_count`
+    embeds each author's books (up to `books_limit`) and book count.
+    The ETag follows the author (and, with `include`, book) table versions.
     """
-    return await AuthorService.get_all_authors(db)
+    tables = ("author", "book") if include else ("author",)
+    etag = make_etag(
+        "authors", await BookService.get_catalog_versions(db, *tables), sorted(request.query_params.multi_items())
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+
+    if pagination == "cursor" or cursor:
+        authors, next_cursor = await AuthorService.get_authors_keyset(
+            db, name, page_size, sort_by, sort_order, cursor, include_biography
+        )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+    else:
+        authors = await AuthorService.get_authors(
+            db, name, page, page_size, sort_by, sort_order, include_biography
+        )
 
+    if include:
+        return await AuthorService.attach_includes(db, authors, set(include.split(",")), books_limit)
+    return authors
 
-@router.get("/{author_id}", response_model=AuthorResponse)
-async def get_author(author_id: int,db: AsyncSession = Depends(get_db)) -> Row[Any]:
+
+@router.get("/{author_id}", response_model=AuthorDetailResponse, response_model_exclude_none=True)
+async def get_author(
+    author_id: int,
+    request: Request,
+    response: Response,
+    include: str = Query(None, pattern=INCLUDE_PATTERN),
+    books_limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+) -> Any:
     """
     Retrieves a specific author by their ID from the database.
+    `include=books,book_count` embeds the author's books (up to `books_limit`) and book count.
+    Honors `If-None-Match` against the author's ETag.
     """
-    return await AuthorService.get_author_by_id(db, author_id)
+    author = await AuthorService.get_author_by_id(db, author_id)
+    etag_parts: tuple[Any, ...] = ("author", author.id, author.updated_at)
+    if include:
+        etag_parts += (await BookService.get_catalog_versions(db, "book"), include, books_limit)
+    etag = make_etag(*etag_parts)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+
+    if include:
+        [author_data] = await AuthorService.attach_includes(
+            db, [author], set(include.split(",")), books_limit
+        )
+        return author_data
+    return author
 
 
 @router.post("/", response_model=AuthorResponse, status_code=201)
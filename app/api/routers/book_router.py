@@ -1,17 +1,46 @@
-from typing import List
+from typing import Any, List
 
-from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 
+from app.core.config import (
+    AUTOCOMPLETE_ENABLED,
+    BOOK_BATCH_MAX_IDS,
+    IMPORT_BATCH_SIZE,
+    TITLE_SEARCH_THRESHOLD,
+)
 from app.core.db import AsyncSession, get_db
-from app.repositories.book_repo import BookRepository
-from app.schemas.book_schemas import BookCreateAndUpdateSchema, BookResponseSchema
-from app.services.book_service import BookService
+from app.core.etag import etag_matches, make_etag, not_modified
+from app.core.responses import json_response, row_to_json, rows_to_dicts, rows_to_json, to_json
+from app.schemas.book_schemas import (
+    AutocompleteSuggestionSchema,
+    BookBatchResponseSchema,
+    BookBulkDeleteSchema,
+    BookBulkResultSchema,
+    BookBulkUpdateSchema,
+    BookCreateAndUpdateSchema,
+    BookImportReportSchema,
+    BookResponseSchema,
+    BookSearchResultSchema,
+    ImportJobSchema,
+)
+from app.services.autocomplete_service import autocomplete_service
+from app.services.book_service import EXPORT_MEDIA_TYPES, BookService
+from app.services.import_job_service import import_job_service
+from app.services.import_service import BookImportService
 
 router = APIRouter()
 
+# Column order of the book rows returned by the repository, matching BookResponseSchema.
+BOOK_RESPONSE_FIELDS = tuple(BookResponseSchema.model_fields)
+BOOK_SEARCH_FIELDS = tuple(BookSearchResultSchema.model_fields)
+AUTOCOMPLETE_FIELDS = tuple(AutocompleteSuggestionSchema.model_fields)
+# book.id is a Postgres integer column.
+MAX_BOOK_ID = 2**31 - 1
+
 
 @router.post("/", response_model=BookResponseSchema)
-async def create_book(book: BookCreateAndUpdateSchema, db: AsyncSession = Depends(get_db)) -> BookResponseSchema:
+async def create_book(book: BookCreateAndUpdateSchema, db: AsyncSession = Depends(get_db)) -> Response:
     """
     Creates a new book in the database.
     """
@@ -20,17 +49,13 @@ async def create_book(book: BookCreateAndUpdateSchema, db: AsyncSession = Depend
     )
     if not book_data:
         raise HTTPException(status_code=400, detail="Error creating book")
-    return BookResponseSchema(
-        id=book_data[0],
-        title=book_data[1],
-        genre=book_data[2],
-        published_year=book_data[3],
-        author_id=book_data[4],
-    )
+    return json_response(row_to_json(book_data, BOOK_RESPONSE_FIELDS))
 
 
 @router.get("/", response_model=List[BookResponseSchema])
 async def get_books(
+    request: Request,
+    response: Response,
     title: str = Query(None),
     genre: str = Query(None),
     author_id: int = Query(None),
@@ -38,41 +63,171 @@ async def get_books(
     page_size: int = Query(10, ge=1, le=100),
     sort_by: str = Query("title", pattern="^(title|published_year|author_id)$"),
     sort_order: str = Query("asc", pattern="^(asc|desc)$"),
+    pagination: str = Query("offset", pattern="^(offset|cursor)$"),
+    cursor: str = Query(None),
+    count: str = Query(None, pattern="^(exact|estimate)$"),
     db: AsyncSession = Depends(get_db),
-    ) -> List[BookResponseSchema]:
+    ) -> Any:
     """
     Retrieves a list of books with optional filters, pagination, and sorting.
+    With `pagination=cursor` the page is located by the `cursor` from the previous
+    response's `X-Next-Cursor` header instead of `page`.
+    `count=exact` returns the number of matching books in the `X-Total-Count` header,
+    counted in the same round trip as the page; `count=estimate` returns a cheap
+    estimate (planner statistics, or a briefly cached count for filtered listings).
+    The ETag follows the book table's version, so `If-None-Match` is answered
+    with `304 Not Modified` without running the page query.
     """
-    books = await BookService.get_books(
-        db, title, genre, author_id, page, page_size, sort_by, sort_order
+    etag = make_etag(
+        "books", await BookService.get_catalog_versions(db, "book"), sorted(request.query_params.multi_items())
     )
-    return [
-        BookResponseSchema(
-            id=book[0],
-            title=book[1],
-            genre=book[2],
-            published_year=book[3],
-            author_id=book[4],
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+
+    if pagination == "cursor" or cursor:
+        books, next_cursor, total = await BookService.get_books_keyset(
+            db, title, genre, author_id, page_size, sort_by, sort_order, cursor, count
+        )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+    else:
+        books, total = await BookService.get_books(
+            db, title, genre, author_id, page, page_size, sort_by, sort_order, count
+        )
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
+    return json_response(rows_to_json(books, BOOK_RESPONSE_FIELDS), response)
+
+
+@router.get("/batch", response_model=BookBatchResponseSchema)
+async def get_books_by_ids(
+    ids: str = Query(
+        ...,
+        # Ten digits cover any integer ID; longer numbers are rejected before int().
+        pattern=r"^\d{1,10}(,\d{1,10})*$",
+        max_length=BOOK_BATCH_MAX_IDS * 11,
+        description="Comma-separated book IDs",
+    ),
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """
+    Retrieves many books by ID in one request and one query. Books are returned in the
+    requested order; IDs that do not exist are listed in `missing`.
+    """
+    book_ids = [int(book_id) for book_id in ids.split(",")]
+    if len(book_ids) > BOOK_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=400, detail=f"At most {BOOK_BATCH_MAX_IDS} IDs can be requested at once"
         )
-        for book in books
-    ]
+    if max(book_ids) > MAX_BOOK_ID:
+        raise HTTPException(status_code=400, detail="Invalid book ID")
+    books, missing = await BookService.get_books_by_ids(db, book_ids)
+    return json_response(to_json({"books": rows_to_dicts(books, BOOK_RESPONSE_FIELDS), "missing": missing}))
+
+
+@router.get("/autocomplete", response_model=List[AutocompleteSuggestionSchema])
+async def autocomplete(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(10, ge=1, le=50),
+    kind: str = Query(None, pattern="^(book|author)$"),
+) -> Response:
+    """
+    Suggests book titles and author names starting with `q` (case- and accent-insensitive),
+    served from an in-memory prefix index without querying the database.
+    """
+    if not AUTOCOMPLETE_ENABLED or not autocomplete_service.loaded:
+        raise HTTPException(status_code=503, detail="Autocomplete index is not available")
+    return json_response(rows_to_json(autocomplete_service.suggest(q, limit, kind), AUTOCOMPLETE_FIELDS))
+
+
+@router.get("/search", response_model=List[BookSearchResultSchema])
+async def search_books(
+    q: str = Query(..., min_length=1, max_length=200),
+    genre: str = Query(None),
+    author_id: int = Query(None),
+    limit: int = Query(10, ge=1, le=100),
+    threshold: float = Query(TITLE_SEARCH_THRESHOLD, ge=0, le=1),
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """
+    Fuzzy, typo-tolerant title search backed by a pg_trgm index. Results are ordered by
+    relevance and carry their similarity `score`; matches below `threshold` are dropped.
+    """
+    books = await BookService.search_books(db, q, genre, author_id, limit, threshold)
+    return json_response(rows_to_json(books, BOOK_SEARCH_FIELDS))
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_books(
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    title: str = Query(None),
+    genre: str = Query(None),
+    author_id: int = Query(None),
+    sort_by: str = Query("id", pattern="^(id|title|published_year|author_id)$"),
+    sort_order: str = Query("asc", pattern="^(asc|desc)$"),
+    gzip: bool = Query(False),
+) -> StreamingResponse:
+    """
+    Exports every book matching the filters as CSV or NDJSON. Rows are streamed from a
+    server-side cursor, so the download starts immediately and memory use stays flat.
+    With `gzip=true` the body is compressed on the fly (`Content-Encoding: gzip`).
+    """
+    headers = {"Content-Disposition": f'attachment; filename="books.{export_format}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        BookService.export_books(export_format, title, genre, author_id, sort_by, sort_order, gzip),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers=headers,
+    )
+
+
+@router.patch("/bulk", response_model=BookBulkResultSchema)
+async def bulk_update_books(
+    request: BookBulkUpdateSchema, db: AsyncSession = Depends(get_db)
+) -> BookBulkResultSchema:
+    """
+    Applies the same changes to every book selected by `ids` and/or `filter` in a single
+    statement. With `dry_run` only the number of books that would change is returned.
+    Fails with 409 if two books would end up with the same title, author and year, and
+    with 400 if the author does not exist.
+    """
+    criteria = {"ids": request.ids, **(request.filter.model_dump() if request.filter else {})}
+    affected = await BookService.bulk_update_books(
+        db, request.changes.model_dump(exclude_none=True), criteria, request.dry_run
+    )
+    return BookBulkResultSchema(affected=affected, dry_run=request.dry_run)
+
+
+@router.post("/bulk/delete", response_model=BookBulkResultSchema)
+async def bulk_delete_books(
+    request: BookBulkDeleteSchema, db: AsyncSession = Depends(get_db)
+) -> BookBulkResultSchema:
+    """
+    Deletes every book selected by `ids` and/or `filter` in a single statement.
+    With `dry_run` only the number of books that would be deleted is returned.
+    """
+    criteria = {"ids": request.ids, **(request.filter.model_dump() if request.filter else {})}
+    affected = await BookService.bulk_delete_books(db, criteria, request.dry_run)
+    return BookBulkResultSchema(affected=affected, dry_run=request.dry_run)
 
 
 @router.get("/{book_id}", response_model=BookResponseSchema)
-async def get_book_by_id(book_id: int,db: AsyncSession = Depends(get_db)) -> BookResponseSchema:
+async def get_book_by_id(
+    book_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_db)
+) -> Any:
     """
-    Retrieves a book by its ID.
+    Retrieves a book by its ID. Honors `If-None-Match` against the book's ETag.
     """
     book_data = await BookService.get_book_by_id(db, book_id)
     if not book_data:
         raise HTTPException(status_code=404, detail="Book not found")
-    return BookResponseSchema(
-        id=book_data[0],
-        title=book_data[1],
-        genre=book_data[2],
-        published_year=book_data[3],
-        author_id=book_data[4],
-    )
+    etag = make_etag("book", book_data.id, book_data.updated_at)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return json_response(row_to_json(book_data, BOOK_RESPONSE_FIELDS), response)
 
 
 @router.put("/{book_id}", response_model=BookResponseSchema)
@@ -80,7 +235,7 @@ async def update_book(
     book_id: int, 
     book: BookCreateAndUpdateSchema, 
     db: AsyncSession = Depends(get_db)
-    )-> BookResponseSchema:
+    )-> Response:
     """
     Updates an existing book by its ID.
     """
@@ -89,13 +244,7 @@ async def update_book(
     )
     if not book_data:
         raise HTTPException(status_code=404, detail="Book not found")
-    return BookResponseSchema(
-        id=book_data[0],
-        title=book_data[1],
-        genre=book_data[2],
-        published_year=book_data[3],
-        author_id=book_data[4],
-    )
+    return json_response(row_to_json(book_data, BOOK_RESPONSE_FIELDS))
 
 
 @router.delete("/{book_id}", status_code=200)
@@ -109,19 +258,56 @@ async def delete_book(book_id: int,db: AsyncSession = Depends(get_db)) -> dict[s
     return {"message": "Book deleted successfully"}
 
 
-@router.post("/import", status_code=201)
-async def import_books(file: UploadFile = File(...),db: AsyncSession = Depends(get_db)) -> dict[str, str]:
+@router.post(
+    "/import",
+    response_model=BookImportReportSchema,
+    status_code=201,
+    responses={202: {"model": ImportJobSchema}},
+)
+async def import_books(
+    file: UploadFile = File(...),
+    batch_size: int = Query(IMPORT_BATCH_SIZE, ge=1, le=100_000),
+    run_async: bool = Query(False, alias="async"),
+    mode: str = Query("insert", pattern="^(insert|upsert|ignore)$"),
+    on_error: str = Query("abort", pattern="^(abort|skip)$"),
+    db: AsyncSession = Depends(get_db),
+) -> Any:
     """
-    Imports books from a JSON or CSV file.
+    Imports books from a JSON, NDJSON or CSV file, streaming it in batches, and reports
+    the import throughput. With `async=true` the file is queued as a background job
+    and its ID is returned immediately. `mode=upsert` or `mode=ignore` deduplicate on
+    the natural key (title + author_id + published_year, the unique `uq_book_natural_key` index),
+    updating or keeping existing books, so an import can safely be re-run.
+    `on_error=skip` rejects invalid rows instead of aborting and still commits the
+    valid ones; the report lists the rejected row numbers and reasons, and background
+    jobs keep all of them as a CSV under `/book/import/{job_id}/rejects`.
+    Rows may give `author_name` instead of `author_id`; unknown authors are created.
     """
-    if file.content_type == "application/json":
-        books = await BookService.import_books_from_json(file)
-    elif file.content_type == "text/csv":
-        books = await BookService.import_books_from_csv(file)
-    else:
-        raise HTTPException(
-            status_code=400, detail="Invalid file type. Only JSON and CSV are allowed."
-        )
+    if run_async:
+        job = await import_job_service.submit(file, batch_size, mode, on_error)
+        return JSONResponse(status_code=202, content=job.model_dump(mode="json"))
+
+    batches = BookService.stream_books(file, file.content_type, batch_size)
+    return await BookImportService.import_books(db, batches, mode=mode, on_error=on_error)
+
 
-    await BookRepository.bulk_insert_books(db, books)
-    return {"message": "Books imported successfully"}
+@router.get("/import/{job_id}", response_model=ImportJobSchema)
+async def get_import_job(job_id: str) -> ImportJobSchema:
+    """
+    Retrieves the status and progress of a background import job.
+    """
+    job = import_job_service.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
+
+
+@router.get("/import/{job_id}/rejects", response_class=FileResponse)
+async def get_import_rejects(job_id: str) -> FileResponse:
+    """
+    Downloads the rows a background import with `on_error=skip` rejected, as CSV.
+    """
+    path = import_job_service.get_rejects_path(job_id)
+    if not path:
+        raise HTTPException(status_code=404, detail="Import rejects not found")
+    return FileResponse(path, media_type="text/csv", filename=f"{job_id}.rejects.csv")
@@ -0,0 +1,42 @@
+from typing import Any
+
+from fastapi import APIRouter
+
+from app.core.cache import get_cache_stats
+from app.core.db import get_pool_stats
+from app.services.autocomplete_service import autocomplete_service
+from app.services.book_service import book_reads
+
+router = APIRouter()
+
+
+@router.get("/pool")
+async def pool_stats() -> dict[str, Any]:
+    """
+    Returns live database connection pool statistics for tuning concurrency per pod.
+    """
+    return get_pool_stats()
+
+
+@router.get("/cache")
+async def cache_stats() -> dict[str, Any]:
+    """
+    Returns size and hit/miss/eviction counters of the in-process caches.
+    """
+    return get_cache_stats()
+
+
+@router.get("/singleflight")
+async def singleflight_stats() -> dict[str, Any]:
+    """
+    Returns how many book reads ran and how many were coalesced into an in-flight read.
+    """
+    return book_reads.stats()
+
+
+@router.get("/autocomplete")
+async def autocomplete_stats() -> dict[str, Any]:
+    """
+    Returns the size and load state of the in-memory autocomplete index.
+    """
+    return autocomplete_service.stats()
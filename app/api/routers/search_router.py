@@ -0,0 +1,33 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, Query, Response
+
+from app.core.db import AsyncSession, get_db
+from app.core.responses import json_response, rows_to_json
+from app.schemas.search_schema import SearchHitSchema
+from app.services.search_service import SearchService
+
+router = APIRouter()
+
+SEARCH_HIT_FIELDS = tuple(SearchHitSchema.model_fields)
+
+
+@router.get("/", response_model=List[SearchHitSchema])
+async def search(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=500, description="Web-search style query"),
+    kind: str = Query(None, pattern="^(book|author)$"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str = Query(None),
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """
+    Ranked full-text search across book titles and author names and biographies.
+    Returns mixed hits with highlighted snippets, best first. The next page's cursor
+    is returned in the `X-Next-Cursor` header.
+    """
+    kinds = (kind,) if kind else ("book", "author")
+    hits, next_cursor = await SearchService.search(db, q, kinds, limit, cursor)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return json_response(rows_to_json(hits, SEARCH_HIT_FIELDS), response)
@@ -0,0 +1,155 @@
+import unicodedata
+from bisect import bisect_left, insort
+from itertools import islice
+from typing import Any, Iterable, Optional, Sequence
+
+# (normalized text, kind, id); sorting these tuples sorts by text first.
+IndexKey = tuple[str, str, int]
+# An index key with the label it was normalized from, ready to be merged in.
+PreparedEntry = tuple[IndexKey, str]
+
+# Keys per bucket after a load; a bucket is split in two once it holds twice as many.
+BUCKET_SIZE = 1000
+
+
+def normalize(text: str) -> str:
+    """
+    Normalizes text for prefix matching: accents stripped, case folded, whitespace collapsed.
+    """
+    if not text.isascii():
+        decomposed = unicodedata.normalize("NFKD", text)
+        text = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(text.casefold().split())
+
+
+class PrefixIndex:
+    """
+    In-memory prefix index over labelled entries (e.g. book titles and author names).
+    Normalized keys are kept sorted, split into buckets of at most `BUCKET_SIZE * 2`
+    keys with the last key of each bucket alongside, so a lookup is a binary search for
+    the prefix followed by a scan of the matching run, and an insert or delete only
+    shifts one bucket. Meant to be used from a single event loop.
+    """
+
+    def __init__(self) -> None:
+        self._buckets: list[list[IndexKey]] = []
+        self._maxes: list[IndexKey] = []
+        self._labels: dict[tuple[str, int], str] = {}
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def load(self, entries: Iterable[tuple[str, int, str]]) -> None:
+        """
+        Replaces the whole index with the given (kind, id, label) entries.
+        """
+        self.replace([((normalize(label), kind, entry_id), label) for kind, entry_id, label in entries])
+
+    def prepare(
+        self, kind: str, rows: Sequence[Sequence[Any]], only_changed: bool = True
+    ) -> list[PreparedEntry]:
+        """
+        Normalizes (id, label) rows of one kind for `merge` or `replace`, skipping the
+        ones already indexed with the same label unless `only_changed` is False. Cheap
+        enough to run per fetched partition, between awaits.
+        """
+        labels = self._labels
+        return [
+            ((normalize(label), kind, entry_id), label)
+            for entry_id, label in rows
+            if not only_changed or labels.get((kind, entry_id)) != label
+        ]
+
+    def replace(self, entries: Iterable[PreparedEntry]) -> None:
+        """
+        Replaces the whole index with prepared entries, sorting them once.
+        """
+        latest = {(key[1], key[2]): (key, label) for key, label in entries}
+        keys = sorted(key for key, _ in latest.values())
+        self._buckets = [keys[start : start + BUCKET_SIZE] for start in range(0, len(keys), BUCKET_SIZE)]
+        self._maxes = [bucket[-1] for bucket in self._buckets]
+        self._labels = {entry: label for entry, (_, label) in latest.items()}
+
+    def merge(self, entries: Iterable[PreparedEntry]) -> int:
+        """
+        Adds or relabels many prepared entries and returns how many changed. Each change
+        costs a binary search and a shift within one bucket, whatever the index size.
+        """
+        changed = 0
+        for key, label in entries:
+            entry = (key[1], key[2])
+            previous = self._labels.get(entry)
+            if previous == label:
+                continue
+            if previous is not None:
+                self._delete_key((normalize(previous), *entry))
+            self._insert_key(key)
+            self._labels[entry] = label
+            changed += 1
+        return changed
+
+    def add(self, kind: str, entry_id: int, label: str) -> None:
+        """
+        Adds an entry, replacing its previous label if it is already indexed.
+        """
+        self.merge([((normalize(label), kind, entry_id), label)])
+
+    def remove(self, kind: str, entry_id: int) -> bool:
+        """
+        Removes an entry, returning whether it was indexed.
+        """
+        label = self._labels.pop((kind, entry_id), None)
+        if label is None:
+            return False
+        self._delete_key((normalize(label), kind, entry_id))
+        return True
+
+    def search(self, prefix: str, limit: int = 10, kind: Optional[str] = None) -> list[tuple[str, int, str]]:
+        """
+        Returns up to `limit` (kind, id, label) entries whose normalized label starts with
+        the normalized prefix, in alphabetical order.
+        """
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        matches = []
+        first = bisect_left(self._maxes, (prefix,))
+        for bucket_index in range(first, len(self._buckets)):
+            bucket = self._buckets[bucket_index]
+            start = bisect_left(bucket, (prefix,)) if bucket_index == first else 0
+            for text, entry_kind, entry_id in islice(bucket, start, None):
+                if not text.startswith(prefix):
+                    return matches
+                if kind is None or entry_kind == kind:
+                    matches.append((entry_kind, entry_id, self._labels[(entry_kind, entry_id)]))
+                    if len(matches) >= limit:
+                        return matches
+        return matches
+
+    def _insert_key(self, key: IndexKey) -> None:
+        if not self._buckets:
+            self._buckets.append([key])
+            self._maxes.append(key)
+            return
+        position = min(bisect_left(self._maxes, key), len(self._buckets) - 1)
+        bucket = self._buckets[position]
+        insort(bucket, key)
+        self._maxes[position] = bucket[-1]
+        if len(bucket) > BUCKET_SIZE * 2:
+            self._buckets[position : position + 1] = [bucket[:BUCKET_SIZE], bucket[BUCKET_SIZE:]]
+            self._maxes[position : position + 1] = [bucket[BUCKET_SIZE - 1], bucket[-1]]
+
+    def _delete_key(self, key: IndexKey) -> None:
+        position = bisect_left(self._maxes, key)
+        if position == len(self._buckets):
+            return
+        bucket = self._buckets[position]
+        index = bisect_left(bucket, key)
+        if index == len(bucket) or bucket[index] != key:
+            return
+        del bucket[index]
+        if bucket:
+            self._maxes[position] = bucket[-1]
+        else:
+            del self._buckets[position]
+            del self._maxes[position]
@@ -0,0 +1,141 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Iterable, Optional
+
+
+class TTLCache:
+    """
+    In-process LRU cache whose entries expire after a time-to-live. Entries can be
+    tagged so that a group of them (e.g. everything belonging to one user) can be
+    evicted at once. Meant to be used from a single event loop.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[Any, float, tuple[Hashable, ...]]] = OrderedDict()
+        self._tags: dict[Hashable, set[Hashable]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry[1] > time.monotonic()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Returns the cached value for the key, or `default` if it is missing or expired.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        if entry[1] <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def set(
+        self, key: Hashable, value: Any, ttl: Optional[float] = None, tags: Iterable[Hashable] = ()
+    ) -> None:
+        """
+        Stores a value, optionally with a shorter TTL and tags for group invalidation.
+        """
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        if key in self._entries:
+            self._remove(key)
+        tags = tuple(tags)
+        self._entries[key] = (value, time.monotonic() + ttl, tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.maxsize:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> bool:
+        """
+        Removes a single entry, returning whether it was cached.
+        """
+        if key not in self._entries:
+            return False
+        self._remove(key)
+        return True
+
+    def invalidate_tag(self, tag: Hashable) -> int:
+        """
+        Removes every entry carrying the tag and returns how many were removed.
+        """
+        keys = self._tags.pop(tag, set())
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        """
+        Removes all entries, keeping the counters.
+        """
+        self._entries.clear()
+        self._tags.clear()
+
+    def stats(self) -> dict[str, int | float]:
+        """
+        Returns the size and hit/miss/eviction counters of the cache.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+caches: dict[str, TTLCache] = {}
+
+
+def register_cache(name: str, cache: TTLCache) -> TTLCache:
+    """
+    Registers a cache under a name so it shows up in the cache statistics and flushes.
+    """
+    caches[name] = cache
+    return cache
+
+
+def get_cache_stats() -> dict[str, dict[str, int | float]]:
+    """
+    Returns the statistics of every registered cache.
+    """
+    return {name: cache.stats() for name, cache in caches.items()}
+
+
+def clear_caches() -> None:
+    """
+    Empties every registered cache.
+    """
+    for cache in caches.values():
+        cache.clear()
@@ -1,11 +1,65 @@
+import time
+from typing import Any
+
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
-from app.core.config import DATABASE_URL
+from app.core.config import (
+    DATABASE_URL,
+    DB_COMMAND_TIMEOUT,
+    DB_ECHO,
+    DB_MAX_OVERFLOW,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_STATEMENT_CACHE_SIZE,
+)
 
 Base = declarative_base()
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """
+    Connection pool that records how long callers wait to check out a connection.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def connect(self) -> Any:
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except Exception:
+            self.checkout_failures += 1
+            raise
+        waited = time.perf_counter() - started
+        self.checkouts += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        return connection
+
+
+engine = create_async_engine(
+    DATABASE_URL,
+    echo=DB_ECHO,
+    poolclass=InstrumentedAsyncPool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    connect_args={
+        "prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+        "command_timeout": DB_COMMAND_TIMEOUT,
+    },
+)
 
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
@@ -17,3 +71,27 @@ AsyncSessionLocal = async_sessionmaker(
 async def get_db():
     async with AsyncSessionLocal() as session:
         yield session
+
+
+def get_pool_stats() -> dict[str, Any]:
+    """
+    Returns live statistics of the engine's connection pool.
+    """
+    pool = engine.pool
+    stats: dict[str, Any] = {
+        "size": pool.size(),  # type: ignore[attr-defined]
+        "checked_in": pool.checkedin(),  # type: ignore[attr-defined]
+        "checked_out": pool.checkedout(),  # type: ignore[attr-defined]
+        "overflow": max(pool.overflow(), 0),  # type: ignore[attr-defined]
+        "max_overflow": DB_MAX_OVERFLOW,
+        "timeout": DB_POOL_TIMEOUT,
+    }
+    if isinstance(pool, InstrumentedAsyncPool):
+        stats.update(
+            checkouts=pool.checkouts,
+            checkout_failures=pool.checkout_failures,
+            total_wait_seconds=round(pool.total_wait, 4),
+            avg_wait_seconds=round(pool.total_wait / pool.checkouts, 6) if pool.checkouts else 0.0,
+            max_wait_seconds=round(pool.max_wait, 4),
+        )
+    return stats
@@ -0,0 +1,150 @@
+import asyncio
+import json
+import logging
+from typing import Any, Callable, Iterable, Optional
+
+import asyncpg
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+from app.core.config import (
+    CACHE_NOTIFY_CHANNEL,
+    CACHE_NOTIFY_ENABLED,
+    CACHE_NOTIFY_HEALTHCHECK_INTERVAL,
+    CACHE_NOTIFY_MAX_RECONNECT_DELAY,
+    DATABASE_URL,
+)
+from app.core.db import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+# NOTIFY payloads are limited to 8000 bytes; larger changes are sent as a flush.
+MAX_PAYLOAD_SIZE = 7900
+
+ChangeHandler = Callable[[Optional[list[int]]], None]
+
+
+async def notify_change(db: AsyncSession, entity: str, ids: Iterable[int]) -> None:
+    """
+    Queues a change notification in the current transaction. Postgres delivers it to
+    every listener when the transaction commits and drops it on rollback.
+    """
+    if not CACHE_NOTIFY_ENABLED:
+        return
+    payload = json.dumps({"entity": entity, "ids": list(ids)}, separators=(",", ":"))
+    if len(payload) > MAX_PAYLOAD_SIZE:
+        payload = json.dumps({"entity": entity, "ids": None}, separators=(",", ":"))
+    await db.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": CACHE_NOTIFY_CHANNEL, "payload": payload},
+    )
+
+
+class ChangeListener:
+    """
+    Keeps one dedicated asyncpg connection LISTENing for change notifications and
+    dispatches them to the subscribed handlers. A handler receives the changed IDs,
+    or None when everything of that entity must be flushed. After a lost connection
+    it reconnects with backoff and flushes every entity, since notifications sent
+    in the meantime are lost.
+    """
+
+    def __init__(self, dsn: str, channel: str) -> None:
+        self._dsn = dsn
+        self._channel = channel
+        self._handlers: dict[str, list[ChangeHandler]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.connected = False
+        self.reconnects = 0
+
+    def subscribe(self, entity: str, handler: ChangeHandler) -> None:
+        """
+        Registers a handler for changes of an entity.
+        """
+        self._handlers.setdefault(entity, []).append(handler)
+
+    def start(self) -> None:
+        """
+        Starts listening in the background.
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stops listening and closes the connection.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def dispatch(self, entity: str, ids: Optional[list[int]]) -> None:
+        """
+        Passes a change to the handlers subscribed to the entity.
+        """
+        for handler in self._handlers.get(entity, []):
+            try:
+                handler(ids)
+            except Exception:
+                logger.exception("Change handler for %s failed", entity)
+
+    def flush_all(self) -> None:
+        """
+        Tells every handler to drop everything it holds.
+        """
+        for entity in self._handlers:
+            self.dispatch(entity, None)
+
+    def _on_notification(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        try:
+            change = json.loads(payload)
+            self.dispatch(change["entity"], change.get("ids"))
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed change notification: %r", payload)
+
+    async def _run(self) -> None:
+        delay = 1.0
+        first_connection = True
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self._dsn)
+                lost = asyncio.Event()
+                connection.add_termination_listener(lambda _: lost.set())
+                await connection.add_listener(self._channel, self._on_notification)
+                self.connected = True
+                delay = 1.0
+                if not first_connection:
+                    self.reconnects += 1
+                    self.flush_all()
+                first_connection = False
+
+                while not lost.is_set():
+                    try:
+                        await asyncio.wait_for(lost.wait(), CACHE_NOTIFY_HEALTHCHECK_INTERVAL)
+                    except asyncio.TimeoutError:
+                        await connection.execute("SELECT 1", timeout=CACHE_NOTIFY_HEALTHCHECK_INTERVAL)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Change listener disconnected: %s", e)
+            finally:
+                self.connected = False
+                if connection is not None and not connection.is_closed():
+                    connection.terminate()
+
+            # Notifications sent while disconnected are lost, so the next
+            # successful connection flushes everything cached in the meantime.
+            first_connection = False
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, CACHE_NOTIFY_MAX_RECONNECT_DELAY)
+
+
+change_listener = ChangeListener(
+    make_url(DATABASE_URL).set(drivername="postgresql").render_as_string(hide_password=False),
+    CACHE_NOTIFY_CHANNEL,
+)
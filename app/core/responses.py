@@ -0,0 +1,44 @@
+from typing import Any, Iterable, Optional, Sequence
+
+import orjson
+from fastapi import Response
+
+
+def row_to_json(row: Sequence[Any], fields: Sequence[str]) -> bytes:
+    """
+    Serializes a single database row to a JSON object keyed by `fields`.
+    """
+    return orjson.dumps(dict(zip(fields, row)))
+
+
+def rows_to_dicts(rows: Iterable[Sequence[Any]], fields: Sequence[str]) -> list[dict[str, Any]]:
+    """
+    Turns database rows into plain dicts keyed by `fields`, ready for `to_json`.
+    Extra trailing columns are ignored.
+    """
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def rows_to_json(rows: Iterable[Sequence[Any]], fields: Sequence[str]) -> bytes:
+    """
+    Serializes database rows to a JSON array of objects keyed by `fields`, without
+    building a Pydantic model per row.
+    """
+    return orjson.dumps(rows_to_dicts(rows, fields))
+
+
+def to_json(content: Any) -> bytes:
+    """
+    Serializes plain data (dicts, lists, numbers, strings, datetimes) to JSON bytes.
+    """
+    return orjson.dumps(content)
+
+
+def json_response(content: bytes, response: Optional[Response] = None, status_code: int = 200) -> Response:
+    """
+    Wraps pre-serialized JSON bytes in a response, carrying over the headers set on
+    the endpoint's injected `response` (FastAPI drops them when a Response is returned).
+    The route's `response_model` still documents the body in OpenAPI.
+    """
+    headers = dict(response.headers) if response is not None else None
+    return Response(content=content, status_code=status_code, media_type="application/json", headers=headers)
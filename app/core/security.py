@@ -1,4 +1,7 @@
-from typing import Any
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
@@ -7,10 +10,28 @@ from passlib.context import CryptContext
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from app.core.config import ALGORITHM, SECRET_KEY
+from app.core.config import (
+    ALGORITHM,
+    BCRYPT_ROUNDS,
+    PASSWORD_HASH_MAX_CONCURRENCY,
+    PASSWORD_HASH_WORKERS,
+    SECRET_KEY,
+    TOKEN_CACHE_SIZE,
+    TOKEN_CACHE_TTL,
+)
+from app.core.cache import TTLCache, register_cache
 from app.core.db import get_db
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+# bcrypt releases the GIL, so a thread pool keeps hashing off the event loop;
+# the semaphore caps how many hashes can be queued or running at once.
+password_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+password_slots = asyncio.Semaphore(PASSWORD_HASH_MAX_CONCURRENCY)
+
+T = TypeVar("T")
 
 
 def hash_password(password: str) -> str:
@@ -27,8 +48,45 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """
+    Verifies a password and returns a new hash when the stored one uses outdated settings,
+    e.g. a different bcrypt cost factor.
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+async def run_password_task(func: Callable[..., T], *args: Any) -> T:
+    """
+    Runs a CPU-bound password function on the password hashing pool.
+    """
+    async with password_slots:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(password_executor, func, *args)
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hashes a password without blocking the event loop.
+    """
+    return await run_password_task(hash_password, password)
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """
+    Verifies a password, and computes its rehash if needed, without blocking the event loop.
+    """
+    return await run_password_task(verify_and_update_password, plain_password, hashed_password)
+
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/jwt/create")
 
+# Verified tokens mapped to their user, so repeated requests skip both the
+# signature check and the user lookup. Entries never outlive the token's `exp`.
+token_cache = register_cache("token", TTLCache(maxsize=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_TTL))
+
 
 def verify_token(token: str) -> dict[str, Any]:
     """
@@ -42,6 +100,11 @@ def verify_token(token: str) -> dict[str, Any]:
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token does not contain valid subject (user_id)",
             )
+        if payload.get("type") == "refresh":
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Refresh tokens cannot be used for authentication",
+            )
         return payload
     except JWTError:
         raise HTTPException(
@@ -53,7 +116,12 @@ def verify_token(token: str) -> dict[str, Any]:
 async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Any:
     """
     Retrieves the current user from the database using the provided JWT token.
+    Verified tokens are served from the token cache until they expire.
     """
+    cached_user = token_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+
     payload = verify_token(token)
     user_id = payload.get("sub")
     if user_id is None:
@@ -72,4 +140,14 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
+
+    expires_in = payload["exp"] - time.time() if "exp" in payload else TOKEN_CACHE_TTL
+    token_cache.set(token, user, ttl=expires_in, tags=(f"user:{user_id}",))
     return user
+
+
+def invalidate_user_tokens(user_id: int) -> None:
+    """
+    Evicts every cached token of a user; call it whenever the user changes.
+    """
+    token_cache.invalidate_tag(f"user:{user_id}")
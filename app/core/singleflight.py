@@ -0,0 +1,46 @@
+import asyncio
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key: the first caller runs the call and
+    every caller arriving while it is in flight awaits the same result. The call runs
+    as its own task and outlives a cancelled caller, so it must not use resources
+    owned by one caller's request, such as its database session. Keys must be built
+    from hashable primitives.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Runs `func` unless a call with the same key is already in flight, and returns its result.
+        """
+        task = self._calls.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.calls += 1
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        # Shielded so that one cancelled caller does not cancel the call for the others.
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns how many calls ran and how many were served by an in-flight call.
+        """
+        return {"in_flight": len(self._calls), "calls": self.calls, "coalesced": self.coalesced}
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # mark as retrieved when every caller was cancelled
@@ -1,13 +1,40 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer
 
 from app.api.routers.auth_router import router as auth_router
 from app.api.routers.author_router import router as author_router
 from app.api.routers.book_router import router as book_router
+from app.api.routers.internal_router import router as internal_router
+from app.api.routers.search_router import router as search_router
 from app.api.routers.user_router import router as user_router
+from app.core.config import AUTOCOMPLETE_ENABLED, CACHE_NOTIFY_ENABLED, INTERNAL_ENDPOINTS_ENABLED
+from app.core.notifications import change_listener
+from app.core.security import get_current_user
+from app.services.author_service import AuthorService
+from app.services.autocomplete_service import autocomplete_service
+from app.services.book_service import BookService
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if AUTOCOMPLETE_ENABLED:
+        await autocomplete_service.load()
+    if CACHE_NOTIFY_ENABLED:
+        change_listener.subscribe("book", BookService.apply_change_notification)
+        change_listener.subscribe("author", AuthorService.apply_change_notification)
+        if AUTOCOMPLETE_ENABLED:
+            change_listener.subscribe("book", autocomplete_service.apply_book_change)
+            change_listener.subscribe("author", autocomplete_service.apply_author_change)
+            change_listener.subscribe("book_import", autocomplete_service.apply_book_import)
+        change_listener.start()
+    yield
+    await change_listener.stop()
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -15,6 +42,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "ETag"],
 )
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/jwt/create")
@@ -23,6 +51,15 @@ app.include_router(auth_router, prefix="/auth", tags=["Auth"])
 app.include_router(user_router, prefix="/user", tags=["User"])
 app.include_router(book_router, prefix="/book", tags=["Book"])
 app.include_router(author_router, prefix="/author", tags=["Author"])
+app.include_router(search_router, prefix="/search", tags=["Search"])
+# Operational statistics are off by default and, when enabled, require a signed-in user.
+if INTERNAL_ENDPOINTS_ENABLED:
+    app.include_router(
+        internal_router,
+        prefix="/internal",
+        tags=["Internal"],
+        dependencies=[Depends(get_current_user)],
+    )
 
 
 def custom_openapi():
@@ -1,6 +1,8 @@
-from typing import List
+from datetime import datetime
+from typing import Any, List
 
-from sqlalchemy import Text
+from sqlalchemy import Computed, DateTime, Index, Text, func
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.db import Base
@@ -14,7 +16,23 @@ class Author(Base):
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True, index=True)
     name: Mapped[str] = mapped_column(unique=True, index=True, nullable=False)
     biography: Mapped[str] = mapped_column(Text, nullable=False, default="")
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    search_vector: Mapped[Any] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(biography, '')), 'B')",
+            persisted=True,
+        ),
+    )
 
     books: Mapped[List[Book]] = relationship(
         "Book", back_populates="author", lazy="selectin"
     )
+
+    __table_args__ = (
+        Index("ix_author_name_pattern", "name", postgresql_ops={"name": "text_pattern_ops"}),
+        Index("ix_author_search_vector", "search_vector", postgresql_using="gin"),
+    )
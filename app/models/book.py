@@ -1,9 +1,15 @@
-from sqlalchemy import CheckConstraint, ForeignKey
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import CheckConstraint, Computed, DateTime, ForeignKey, Index, func
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.db import Base
 
 ALLOWED_GENRES = ["Fiction", "Non-Fiction", "Science", "History"]
+# Columns of the unique index identifying a book; upsert imports conflict on them.
+BOOK_NATURAL_KEY = ("title", "author_id", "published_year")
 
 
 class Book(Base):
@@ -14,10 +20,29 @@ class Book(Base):
     genre: Mapped[str] = mapped_column(index=True)
     published_year: Mapped[int] = mapped_column(nullable=False)
     author_id: Mapped[int] = mapped_column(ForeignKey("author.id", ondelete="CASCADE"))  # type: ignore
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    search_vector: Mapped[Any] = mapped_column(
+        TSVECTOR,
+        Computed("setweight(to_tsvector('english', coalesce(title, '')), 'A')", persisted=True),
+    )
 
     author = relationship("Author", back_populates="books", lazy="selectin")  # type: ignore
 
     __table_args__ = (
         CheckConstraint("published_year >= 1800", name="check_published_year"),
         CheckConstraint(f"genre IN {tuple(ALLOWED_GENRES)}", name="check_genre"),
+        Index("ix_book_title_id", "title", "id"),
+        Index("ix_book_published_year_id", "published_year", "id"),
+        Index("ix_book_author_id_id", "author_id", "id"),
+        Index(
+            "ix_book_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+        Index("ix_book_search_vector", "search_vector", postgresql_using="gin"),
+        Index("uq_book_natural_key", *BOOK_NATURAL_KEY, unique=True),
+        Index("ix_book_updated_at", "updated_at"),
     )
@@ -0,0 +1,14 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.db import Base
+
+
+class UsedRefreshToken(Base):
+    __tablename__ = "used_refresh_token"
+
+    jti: Mapped[str] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("user_data.id", ondelete="CASCADE"))  # type: ignore
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
@@ -1,8 +1,10 @@
-from typing import Any, Sequence
+from typing import Any, Optional, Sequence
 
 from sqlalchemy import Row, text
 
 from app.core.db import AsyncSession
+from app.core.notifications import notify_change
+from app.repositories.catalog_version_repo import CatalogVersionRepository
 
 
 class AuthorRepository:
@@ -11,17 +13,99 @@ class AuthorRepository:
         """
         Retrieves an author by ID from the database.
         """
-        query = text("SELECT * FROM author WHERE id = :author_id")
+        query = text("SELECT id, name, biography, updated_at FROM author WHERE id = :author_id")
         result = await db.execute(query, {"author_id": author_id})
         return result.fetchone()
 
     @staticmethod
-    async def get_all_authors(db: AsyncSession) -> Sequence[Row[Any]]:
+    def _build_filters(name: Optional[str] = None) -> tuple[list[str], dict[str, Any]]:
         """
-        Retrieves all authors from the database.
+        Builds the WHERE conditions and bind parameters shared by the author listing queries.
         """
-        query = text("SELECT * FROM author")
-        result = await db.execute(query)
+        filters = []
+        params: dict[str, Any] = {}
+
+        if name:
+            filters.append("name LIKE :name_prefix ESCAPE '\\'")
+            escaped = name.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            params["name_prefix"] = f"{escaped}%"
+
+        return filters, params
+
+    @staticmethod
+    async def get_authors(
+        db: AsyncSession,
+        name: Optional[str] = None,
+        page: int = 1,
+        page_size: int = 50,
+        sort_by: str = "name",
+        sort_order: str = "asc",
+        include_biography: bool = True,
+    ) -> Sequence[Row[Any]]:
+        """
+        Retrieves authors from the database with a name-prefix filter, pagination, and sorting.
+        """
+        filters, params = AuthorRepository._build_filters(name)
+
+        columns = "id, name, biography" if include_biography else "id, name"
+        where_clause = " WHERE " + " AND ".join(filters) if filters else ""
+        sort_clause = f"ORDER BY {sort_by} {sort_order}"
+
+        query = text(f"""
+            SELECT {columns}
+            FROM author
+            {where_clause}
+            {sort_clause}
+            LIMIT :limit OFFSET :offset
+        """)
+
+        params["limit"] = page_size
+        params["offset"] = (page - 1) * page_size
+
+        result = await db.execute(query, params)
+        return result.fetchall()
+
+    @staticmethod
+    async def get_authors_keyset(
+        db: AsyncSession,
+        name: Optional[str] = None,
+        page_size: int = 50,
+        sort_by: str = "name",
+        sort_order: str = "asc",
+        after: Optional[tuple[Any, int]] = None,
+        include_biography: bool = True,
+    ) -> Sequence[Row[Any]]:
+        """
+        Retrieves one page of authors ordered by (sort_by, id), seeking past the `after`
+        pair instead of skipping rows with OFFSET. One extra row is fetched so the caller
+        can tell whether a next page exists.
+        """
+        filters, params = AuthorRepository._build_filters(name)
+
+        if after is not None:
+            operator = ">" if sort_order == "asc" else "<"
+            if sort_by == "id":
+                filters.append(f"id {operator} :after_id")
+            else:
+                filters.append(f"({sort_by}, id) {operator} (:after_value, :after_id)")
+                params["after_value"] = after[0]
+            params["after_id"] = after[1]
+
+        columns = "id, name, biography" if include_biography else "id, name"
+        where_clause = " WHERE " + " AND ".join(filters) if filters else ""
+        sort_clause = f"ORDER BY {sort_by} {sort_order}, id {sort_order}"
+
+        query = text(f"""
+            SELECT {columns}
+            FROM author
+            {where_clause}
+            {sort_clause}
+            LIMIT :limit
+        """)
+
+        params["limit"] = page_size + 1
+
+        result = await db.execute(query, params)
         return result.fetchall()
 
     @staticmethod
@@ -29,10 +113,56 @@ class AuthorRepository:
         """
         Retrieves an author by their name from the database.
         """
-        query = text("SELECT * FROM author WHERE name = :name")
+        query = text("SELECT id, name, biography, updated_at FROM author WHERE name = :name")
         result = await db.execute(query, {"name": name})
         return result.fetchone()
 
+    @staticmethod
+    async def get_author_ids_by_names(db: AsyncSession, names: Sequence[str]) -> dict[str, int]:
+        """
+        Resolves a batch of author names to IDs with one lookup on the unique name index.
+        """
+        query = text("SELECT id, name FROM author WHERE name = ANY(:names)")
+        result = await db.execute(query, {"names": list(names)})
+        return {row.name: row.id for row in result.fetchall()}
+
+    @staticmethod
+    async def get_or_create_authors(
+        db: AsyncSession, names: Sequence[str]
+    ) -> tuple[dict[str, int], list[Row[Any]]]:
+        """
+        Resolves a batch of author names to IDs, inserting the missing authors (with an
+        empty biography) in one statement in the current transaction. Returns the name
+        to ID mapping and the created (id, name) rows. The caller is responsible for
+        committing.
+        """
+        names = list(set(names))
+        author_ids = await AuthorRepository.get_author_ids_by_names(db, names)
+        missing = [name for name in names if name not in author_ids]
+        if not missing:
+            return author_ids, []
+
+        query = text("""
+            INSERT INTO author (name, biography)
+            SELECT name, '' FROM unnest(CAST(:names AS varchar[])) AS a(name)
+            ON CONFLICT (name) DO NOTHING
+            RETURNING id, name
+        """)
+        result = await db.execute(query, {"names": missing})
+        created = result.fetchall()
+        author_ids.update({row.name: row.id for row in created})
+        if len(created) < len(missing):
+            # Authors committed by a concurrent import since the lookup above.
+            author_ids.update(
+                await AuthorRepository.get_author_ids_by_names(
+                    db, [name for name in missing if name not in author_ids]
+                )
+            )
+        if created:
+            await CatalogVersionRepository.bump(db, "author")
+            await notify_change(db, "author", [row.id for row in created])
+        return author_ids, created
+
     @staticmethod
     async def create_author(db: AsyncSession, name: str, biography: str) -> Row[Any] | None:
         """
@@ -41,11 +171,15 @@ class AuthorRepository:
         query = text("""
             INSERT INTO author (name, biography) 
             VALUES (:name, :biography) 
-            RETURNING id, name, biography
+            RETURNING id, name, biography, updated_at
         """)
         result = await db.execute(query, {"name": name, "biography": biography})
-        await db.commit()
-        return result.fetchone()
+        author = result.fetchone()
+        if author:
+            await CatalogVersionRepository.bump(db, "author")
+            await notify_change(db, "author", [author.id])
+        await CatalogVersionRepository.commit(db)
+        return author
 
     @staticmethod
     async def update_author(db: AsyncSession, author_id: int, name: str, biography: str) -> Row[Any] | None:
@@ -54,13 +188,17 @@ class AuthorRepository:
         """
         query = text("""
             UPDATE author
-            SET name = :name, biography = :biography
+            SET name = :name, biography = :biography, updated_at = now()
             WHERE id = :author_id
-            RETURNING id, name, biography
+            RETURNING id, name, biography, updated_at
         """)
         result = await db.execute(query, {"name": name, "biography": biography, "author_id": author_id})
-        await db.commit()
-        return result.fetchone()
+        author = result.fetchone()
+        if author:
+            await CatalogVersionRepository.bump(db, "author")
+            await notify_change(db, "author", [author_id])
+        await CatalogVersionRepository.commit(db)
+        return author
 
     @staticmethod
     async def delete_author(db: AsyncSession, author_id: int) -> Any:
@@ -69,5 +207,9 @@ class AuthorRepository:
         """
         query = text("DELETE FROM author WHERE id = :author_id")
         result = await db.execute(query, {"author_id": author_id})
-        await db.commit()
+        if result.rowcount:  # type: ignore
+            # Deleting an author also removes (or orphans) their books.
+            await CatalogVersionRepository.bump(db, "author", "book")
+            await notify_change(db, "author", [author_id])
+        await CatalogVersionRepository.commit(db)
         return result.rowcount > 0 # type: ignore
\ No newline at end of file
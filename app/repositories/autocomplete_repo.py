@@ -0,0 +1,77 @@
+from datetime import datetime
+from typing import Any, AsyncIterator, Optional, Sequence
+
+from sqlalchemy import Row, text
+
+from app.core.db import AsyncSession
+
+# The label column indexed for each kind of autocomplete entry.
+AUTOCOMPLETE_SOURCES = {"book": ("book", "title"), "author": ("author", "name")}
+# Where a catch-up scan resumes: a start time and the start times of transactions open then.
+ScanPosition = tuple[datetime, list[datetime]]
+
+
+class AutocompleteRepository:
+    @staticmethod
+    async def stream_labels(
+        db: AsyncSession,
+        kind: str,
+        position: Optional[ScanPosition] = None,
+        fetch_size: int = 10000,
+    ) -> AsyncIterator[Sequence[Row[Any]]]:
+        """
+        Streams (id, label) rows of the given kind in ID order through a server-side
+        cursor, optionally only those written after the given scan position.
+        """
+        table, column = AUTOCOMPLETE_SOURCES[kind]
+        params: dict[str, Any] = {}
+        where_clause = ""
+        if position is not None:
+            where_clause = "WHERE updated_at >= :since OR updated_at = ANY(:open_starts)"
+            params = {"since": position[0], "open_starts": position[1]}
+        query = text(f"""
+            SELECT id, {column}
+            FROM {table}
+            {where_clause}
+            ORDER BY id
+        """).execution_options(yield_per=fetch_size)
+        result = await db.stream(query, params)
+        async for rows in result.partitions(fetch_size):
+            yield rows
+
+    @staticmethod
+    async def get_scan_position(db: AsyncSession) -> ScanPosition:
+        """
+        Returns the point a following scan must resume from. Rows get `updated_at =
+        now()`, their transaction's start time, so a row committed later was written
+        either by a transaction that starts after `since` or by one open now, whose
+        start time is in `open_starts`. A long-lived transaction, such as an export
+        cursor, then costs one equality lookup instead of pinning the scan to its start.
+        """
+        query = text("""
+            SELECT
+                now() - interval '1 second' AS since,
+                coalesce(
+                    array_agg(DISTINCT xact_start) FILTER (
+                        WHERE xact_start < now() - interval '1 second'
+                    ),
+                    '{}'
+                ) AS open_starts
+            FROM pg_stat_activity
+            WHERE datname = current_database() AND pid <> pg_backend_pid()
+        """)
+        result = await db.execute(query)
+        since, open_starts = result.one()
+        return since, list(open_starts)
+
+    @staticmethod
+    async def get_labels(db: AsyncSession, kind: str, ids: Sequence[int]) -> Sequence[Row[Any]]:
+        """
+        Retrieves the (id, label) rows of the given kind for the IDs that still exist.
+        """
+        if not ids:
+            return []
+        table, column = AUTOCOMPLETE_SOURCES[kind]
+        query = text(f"SELECT id, {column} FROM {table} WHERE id = ANY(:ids)")
+        result = await db.execute(query, {"ids": list(ids)})
+        return result.fetchall()
@@ -1,11 +1,17 @@
-from typing import Any, Optional, Sequence
+from typing import Any, AsyncIterator, Iterable, Optional, Sequence
 
-from fastapi import HTTPException
+import asyncpg
 from sqlalchemy import Row, text
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.db import AsyncSession
-from app.models.book import ALLOWED_GENRES
+from app.core.notifications import notify_change
+from app.repositories.catalog_version_repo import CatalogVersionRepository
+
+BOOK_IMPORT_COLUMNS = ["title", "genre", "published_year", "author_id"]
+NATURAL_KEY_CONSTRAINT = "uq_book_natural_key"
+AUTHOR_FOREIGN_KEY = "book_author_id_fkey"
 
 
 class BookRepository:
@@ -17,36 +23,39 @@ class BookRepository:
         query = text("""
             INSERT INTO "book" (title, genre, published_year, author_id)
             VALUES (:title, :genre, :published_year, :author_id)
-            RETURNING id, title, genre, published_year, author_id
+            RETURNING id, title, genre, published_year, author_id, updated_at
         """)
-        async with db.begin():
-            result = await db.execute(
-                query,
-                {
-                    "title": title,
-                    "genre": genre,
-                    "published_year": published_year,
-                    "author_id": author_id,
-                },
-            )
-        return result.fetchone()
+        try:
+            async with db.begin():
+                result = await db.execute(
+                    query,
+                    {
+                        "title": title,
+                        "genre": genre,
+                        "published_year": published_year,
+                        "author_id": author_id,
+                    },
+                )
+                book = result.fetchone()
+                if book:
+                    await CatalogVersionRepository.bump(db, "book")
+                    await notify_change(db, "book", [book.id])
+                await CatalogVersionRepository.apply_bumps(db)
+        except IntegrityError:
+            return None
+        return book
 
     @staticmethod
-    async def get_books(
-        db: AsyncSession,
+    def _build_filters(
         title: Optional[str] = None,
         genre: Optional[str] = None,
         author_id: Optional[int] = None,
-        page: int = 1,
-        page_size: int = 10,
-        sort_by: str = "title",
-        sort_order: str = "asc",
-    ) -> Sequence[Row[Any]]:
+    ) -> tuple[list[str], dict[str, Any]]:
         """
-        Retrieves books from the database with filtering, pagination, and sorting.
+        Builds the WHERE conditions and bind parameters shared by the book listing queries.
         """
         filters = []
-        params = {}
+        params: dict[str, Any] = {}
 
         if title:
             filters.append("title ILIKE :title")
@@ -60,19 +69,43 @@ class BookRepository:
             filters.append("author_id = :author_id")
             params["author_id"] = author_id
 
+        return filters, params
+
+    @staticmethod
+    async def get_books(
+        db: AsyncSession,
+        title: Optional[str] = None,
+        genre: Optional[str] = None,
+        author_id: Optional[int] = None,
+        page: int = 1,
+        page_size: int = 10,
+        sort_by: str = "title",
+        sort_order: str = "asc",
+        with_total: bool = False,
+    ) -> Sequence[Row[Any]]:
+        """
+        Retrieves books from the database with filtering, pagination, and sorting.
+        With `with_total` every row also carries the exact number of matching books
+        (see `_with_total`).
+        """
+        filters, params = BookRepository._build_filters(title, genre, author_id)
+
         where_clause = " WHERE " + " AND ".join(filters) if filters else ""
         sort_clause = f"ORDER BY {sort_by} {sort_order}"
 
         offset = (page - 1) * page_size
         limit = page_size
 
-        query = text(f"""
+        page_query = f"""
             SELECT id, title, genre, published_year, author_id 
             FROM book
             {where_clause}
             {sort_clause}
             LIMIT :limit OFFSET :offset
-        """)
+        """
+        if with_total:
+            page_query = BookRepository._with_total(page_query, where_clause, sort_by, sort_order)
+        query = text(page_query)
 
         params["limit"] = limit
         params["offset"] = offset
@@ -80,16 +113,225 @@ class BookRepository:
         result = await db.execute(query, params)
         return result.fetchall()
 
+    @staticmethod
+    def _with_total(page_query: str, where_clause: str, sort_by: str, sort_order: str) -> str:
+        """
+        Wraps a page query so the exact count of matching books comes back in the same
+        round trip: the count is computed once and the page is joined to it LATERALly.
+        Every row gets a `total_count` column; an empty page yields a single row whose
+        book columns are NULL.
+        """
+        return f"""
+            SELECT page.id, page.title, page.genre, page.published_year, page.author_id,
+                   total.total_count
+            FROM (SELECT count(*) AS total_count FROM book {where_clause}) AS total
+            LEFT JOIN LATERAL ({page_query}) AS page ON true
+            ORDER BY page.{sort_by} {sort_order}, page.id {sort_order}
+        """
+
+    @staticmethod
+    async def count_books(
+        db: AsyncSession,
+        title: Optional[str] = None,
+        genre: Optional[str] = None,
+        author_id: Optional[int] = None,
+    ) -> int:
+        """
+        Counts the books matching the listing filters.
+        """
+        filters, params = BookRepository._build_filters(title, genre, author_id)
+        where_clause = " WHERE " + " AND ".join(filters) if filters else ""
+        result = await db.execute(text(f"SELECT count(*) FROM book {where_clause}"), params)
+        return result.scalar() or 0
+
+    @staticmethod
+    async def estimate_book_count(db: AsyncSession) -> Optional[int]:
+        """
+        Returns the planner's row estimate for the book table, or None if the table
+        has never been vacuumed or analyzed.
+        """
+        result = await db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'book'::regclass")
+        )
+        estimate = result.scalar()
+        return estimate if estimate is not None and estimate >= 0 else None
+
+    @staticmethod
+    async def get_books_keyset(
+        db: AsyncSession,
+        title: Optional[str] = None,
+        genre: Optional[str] = None,
+        author_id: Optional[int] = None,
+        page_size: int = 10,
+        sort_by: str = "title",
+        sort_order: str = "asc",
+        after: Optional[tuple[Any, int]] = None,
+        with_total: bool = False,
+    ) -> Sequence[Row[Any]]:
+        """
+        Retrieves one page of books ordered by (sort_by, id), seeking past the `after`
+        pair with a row-value comparison instead of skipping rows with OFFSET.
+        One extra row is fetched so the caller can tell whether a next page exists.
+        With `with_total` every row also carries the exact number of books matching
+        the filters, regardless of the cursor (see `_with_total`).
+        """
+        filters, params = BookRepository._build_filters(title, genre, author_id)
+        count_where_clause = " WHERE " + " AND ".join(filters) if filters else ""
+
+        if after is not None:
+            operator = ">" if sort_order == "asc" else "<"
+            filters.append(f"({sort_by}, id) {operator} (:after_value, :after_id)")
+            params["after_value"], params["after_id"] = after
+
+        where_clause = " WHERE " + " AND ".join(filters) if filters else ""
+        sort_clause = f"ORDER BY {sort_by} {sort_order}, id {sort_order}"
+
+        page_query = f"""
+            SELECT id, title, genre, published_year, author_id
+            FROM book
+            {where_clause}
+            {sort_clause}
+            LIMIT :limit
+        """
+        if with_total:
+            page_query = BookRepository._with_total(page_query, count_where_clause, sort_by, sort_order)
+        query = text(page_query)
+
+        params["limit"] = page_size + 1
+
+        result = await db.execute(query, params)
+        return result.fetchall()
+
+    @staticmethod
+    async def stream_books(
+        db: AsyncSession,
+        title: Optional[str] = None,
+        genre: Optional[str] = None,
+        author_id: Optional[int] = None,
+        sort_by: str = "id",
+        sort_order: str = "asc",
+        fetch_size: int = 1000,
+    ) -> AsyncIterator[Sequence[Row[Any]]]:
+        """
+        Streams every matching book through a server-side cursor, yielding rows in
+        chunks of `fetch_size` so the full result set is never held in memory.
+        """
+        filters, params = BookRepository._build_filters(title, genre, author_id)
+
+        where_clause = " WHERE " + " AND ".join(filters) if filters else ""
+        sort_clause = f"ORDER BY {sort_by} {sort_order}, id {sort_order}"
+
+        query = text(f"""
+            SELECT id, title, genre, published_year, author_id
+            FROM book
+            {where_clause}
+            {sort_clause}
+        """).execution_options(yield_per=fetch_size)
+
+        result = await db.stream(query, params)
+        async for rows in result.partitions(fetch_size):
+            yield rows
+
+    @staticmethod
+    async def search_books_by_title(
+        db: AsyncSession,
+        term: str,
+        genre: Optional[str] = None,
+        author_id: Optional[int] = None,
+        limit: int = 10,
+        threshold: float = 0.3,
+    ) -> Sequence[Row[Any]]:
+        """
+        Fuzzy-matches titles against the term with pg_trgm word similarity, which tolerates
+        typos and matches the term anywhere in the title, and returns the best matches first
+        with their score. The `<%` operator is served by the trigram GIN index on title.
+        """
+        filters, params = BookRepository._build_filters(None, genre, author_id)
+        filters.insert(0, ":term <% title")
+        params.update({"term": term, "limit": limit})
+
+        # Scope the operator's threshold to the current transaction.
+        await db.execute(
+            text("SELECT set_config('pg_trgm.word_similarity_threshold', :threshold, true)"),
+            {"threshold": str(threshold)},
+        )
+        query = text(f"""
+            SELECT id, title, genre, published_year, author_id,
+                   word_similarity(:term, title) AS score
+            FROM book
+            WHERE {" AND ".join(filters)}
+            ORDER BY score DESC, similarity(title, :term) DESC, id
+            LIMIT :limit
+        """)
+        result = await db.execute(query, params)
+        return result.fetchall()
+
+    @staticmethod
+    async def get_books_by_author_ids(
+        db: AsyncSession, author_ids: Sequence[int], per_author_limit: int = 10
+    ) -> Sequence[Row[Any]]:
+        """
+        Retrieves up to `per_author_limit` books for each of the given authors in one query.
+        """
+        if not author_ids:
+            return []
+        query = text("""
+            SELECT b.id, b.title, b.genre, b.published_year, b.author_id
+            FROM unnest(CAST(:author_ids AS integer[])) AS a(id)
+            CROSS JOIN LATERAL (
+                SELECT id, title, genre, published_year, author_id
+                FROM book
+                WHERE author_id = a.id
+                ORDER BY title, id
+                LIMIT :per_author_limit
+            ) AS b
+        """)
+        result = await db.execute(
+            query, {"author_ids": list(author_ids), "per_author_limit": per_author_limit}
+        )
+        return result.fetchall()
+
+    @staticmethod
+    async def count_books_by_author_ids(db: AsyncSession, author_ids: Sequence[int]) -> dict[int, int]:
+        """
+        Counts the books of each of the given authors in one aggregate query.
+        """
+        if not author_ids:
+            return {}
+        query = text("""
+            SELECT author_id, count(*)
+            FROM book
+            WHERE author_id = ANY(:author_ids)
+            GROUP BY author_id
+        """)
+        result = await db.execute(query, {"author_ids": list(author_ids)})
+        return {row[0]: row[1] for row in result.fetchall()}
+
     @staticmethod
     async def get_book_by_id(db: AsyncSession, book_id: int) -> Row[Any] | None:
         query = text("""
-            SELECT id, title, genre, published_year, author_id 
+            SELECT id, title, genre, published_year, author_id, updated_at
             FROM "book" 
             WHERE id = :book_id
         """)
         result = await db.execute(query, {"book_id": book_id})
         return result.fetchone()
 
+    @staticmethod
+    async def get_books_by_ids(db: AsyncSession, book_ids: Sequence[int]) -> Sequence[Row[Any]]:
+        """
+        Retrieves the books with the given IDs in one query, in no particular order.
+        """
+        if not book_ids:
+            return []
+        query = text("""
+            SELECT id, title, genre, published_year, author_id, updated_at
+            FROM book
+            WHERE id = ANY(:book_ids)
+        """)
+        result = await db.execute(query, {"book_ids": list(book_ids)})
+        return result.fetchall()
+
     @staticmethod
     async def update_book(
         db: AsyncSession,
@@ -100,25 +342,36 @@ class BookRepository:
         author_id: int,
     ) -> Row[Any] | None:
         """
-        Updates a book record in the database.
+        Updates a book record in the database. Returns None if the book does not exist
+        or the update violates a constraint (duplicate natural key or unknown author).
         """
         query = text("""
             UPDATE "book" 
-            SET title = :title, genre = :genre, published_year = :published_year, author_id = :author_id
+            SET title = :title, genre = :genre, published_year = :published_year, author_id = :author_id,
+                updated_at = now()
             WHERE id = :book_id
-            RETURNING id, title, genre, published_year, author_id
+            RETURNING id, title, genre, published_year, author_id, updated_at
         """)
-        result = await db.execute(
-            query,
-            {
-                "title": title,
-                "genre": genre,
-                "published_year": published_year,
-                "author_id": author_id,
-                "book_id": book_id,
-            },
-        )
-        return result.fetchone()
+        try:
+            result = await db.execute(
+                query,
+                {
+                    "title": title,
+                    "genre": genre,
+                    "published_year": published_year,
+                    "author_id": author_id,
+                    "book_id": book_id,
+                },
+            )
+        except IntegrityError:
+            await db.rollback()
+            return None
+        book = result.fetchone()
+        if book:
+            await CatalogVersionRepository.bump(db, "book")
+            await notify_change(db, "book", [book_id])
+        await CatalogVersionRepository.commit(db)
+        return book
 
     @staticmethod
     async def delete_book(db: AsyncSession, book_id: int) -> Any:
@@ -127,46 +380,224 @@ class BookRepository:
         """
         query = text('DELETE FROM "book" WHERE id = :book_id')
         result = await db.execute(query, {"book_id": book_id})
+        if result.rowcount:  # type: ignore
+            await CatalogVersionRepository.bump(db, "book")
+            await notify_change(db, "book", [book_id])
+        await CatalogVersionRepository.commit(db)
         return result.rowcount  # type: ignore
 
     @staticmethod
-    async def bulk_insert_books(db: AsyncSession, books_data: list[dict]) -> None:
+    def _build_bulk_filters(
+        ids: Optional[Sequence[int]] = None,
+        genre: Optional[str] = None,
+        author_id: Optional[int] = None,
+        published_year_min: Optional[int] = None,
+        published_year_max: Optional[int] = None,
+    ) -> tuple[list[str], dict[str, Any]]:
         """
-        Inserts multiple books into the database in bulk.
+        Builds the WHERE conditions and bind parameters that select books for bulk changes.
         """
-        if not books_data:
-            raise HTTPException(status_code=400, detail="No books to import")
+        filters = []
+        params: dict[str, Any] = {}
 
-        existing_authors = await db.execute(text("SELECT id FROM author"))
-        existing_author_ids = {row[0] for row in existing_authors.fetchall()}
+        if ids is not None:
+            filters.append("id = ANY(:ids)")
+            params["ids"] = list(ids)
 
-        query = text("""
-            INSERT INTO book (title, genre, published_year, author_id)
-            VALUES (:title, :genre, :published_year, :author_id)
-        """)
+        if genre is not None:
+            filters.append("genre = :filter_genre")
+            params["filter_genre"] = genre
 
+        if author_id is not None:
+            filters.append("author_id = :filter_author_id")
+            params["filter_author_id"] = author_id
+
+        if published_year_min is not None:
+            filters.append("published_year >= :published_year_min")
+            params["published_year_min"] = published_year_min
+
+        if published_year_max is not None:
+            filters.append("published_year <= :published_year_max")
+            params["published_year_max"] = published_year_max
+
+        return filters, params
+
+    @staticmethod
+    async def count_bulk_matches(db: AsyncSession, **criteria: Any) -> int:
+        """
+        Counts the books a bulk update or delete with the same criteria would affect.
+        """
+        filters, params = BookRepository._build_bulk_filters(**criteria)
+        query = text(f"SELECT count(*) FROM book WHERE {' AND '.join(filters)}")
+        result = await db.execute(query, params)
+        return result.scalar() or 0
+
+    @staticmethod
+    async def bulk_update_books(
+        db: AsyncSession, changes: dict[str, Any], **criteria: Any
+    ) -> tuple[list[int], Optional[str]]:
+        """
+        Applies the same column changes to every book matching the criteria in a single
+        UPDATE and transaction. Returns the IDs of the updated books and None, or no IDs
+        and the name of the constraint the changes violate (e.g. the author foreign key).
+        """
+        filters, params = BookRepository._build_bulk_filters(**criteria)
+        assignments = ", ".join(f"{column} = :set_{column}" for column in changes)
+        params.update({f"set_{column}": value for column, value in changes.items()})
+        query = text(f"""
+            UPDATE book
+            SET {assignments}, updated_at = now()
+            WHERE {" AND ".join(filters)}
+            RETURNING id
+        """)
         try:
-            for book in books_data:
-                if book["genre"] not in ALLOWED_GENRES:
-                    raise HTTPException(
-                        status_code=400, detail=f"Invalid genre: {book['genre']}"
-                    )
+            result = await db.execute(query, params)
+        except IntegrityError as e:
+            await db.rollback()
+            return [], BookRepository.violated_constraint(e)
+        book_ids = [row[0] for row in result.fetchall()]
+        if book_ids:
+            await CatalogVersionRepository.bump(db, "book")
+            await notify_change(db, "book", book_ids)
+        await CatalogVersionRepository.commit(db)
+        return book_ids, None
 
-                if book["published_year"] < 1800:
-                    raise HTTPException(
-                        status_code=400, detail="published_year must be >= 1800"
-                    )
+    @staticmethod
+    def violated_constraint(error: IntegrityError) -> Optional[str]:
+        """
+        Returns the name of the constraint behind an integrity error, if the driver reports it.
+        """
+        # The driver's own exception carries the violated constraint's name.
+        cause = error.orig.__cause__ or error.orig
+        return getattr(cause, "constraint_name", None)
+
+    @staticmethod
+    async def bulk_delete_books(db: AsyncSession, **criteria: Any) -> list[int]:
+        """
+        Deletes every book matching the criteria in a single DELETE and transaction, and
+        returns the IDs of the deleted books.
+        """
+        filters, params = BookRepository._build_bulk_filters(**criteria)
+        query = text(f"DELETE FROM book WHERE {' AND '.join(filters)} RETURNING id")
+        result = await db.execute(query, params)
+        book_ids = [row[0] for row in result.fetchall()]
+        if book_ids:
+            await CatalogVersionRepository.bump(db, "book")
+            await notify_change(db, "book", book_ids)
+        await CatalogVersionRepository.commit(db)
+        return book_ids
+
+    @staticmethod
+    async def get_existing_author_ids(db: AsyncSession, author_ids: Iterable[int]) -> set[int]:
+        """
+        Returns the subset of the given author IDs that exist in the database.
+        """
+        query = text("SELECT id FROM author WHERE id = ANY(:author_ids)")
+        result = await db.execute(query, {"author_ids": list(set(author_ids))})
+        return {row[0] for row in result.fetchall()}
 
-                if book["author_id"] not in existing_author_ids:
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Author ID {book['author_id']} does not exist",
+    @staticmethod
+    async def bulk_insert_books(
+        db: AsyncSession, books: Sequence[tuple[str, str, int, int]], method: str = "copy"
+    ) -> tuple[int, str]:
+        """
+        Inserts a batch of validated (title, genre, published_year, author_id) rows
+        in the current transaction, either over the binary COPY protocol or as a
+        single multi-row executemany. The caller is responsible for committing.
+        Returns the number of inserted rows and the method actually used, since COPY
+        falls back to executemany on drivers without it.
+        """
+        if not books:
+            return 0, method
+
+        if method == "copy":
+            connection = await db.connection()
+            raw_connection = await connection.get_raw_connection()
+            driver_connection = raw_connection.driver_connection
+            if hasattr(driver_connection, "copy_records_to_table"):
+                # COPY bypasses SQLAlchemy, which only sends BEGIN with its first
+                # statement; open the transaction first so the COPY runs inside it.
+                if not driver_connection.is_in_transaction():
+                    await db.execute(text("SELECT 1"))
+                try:
+                    await driver_connection.copy_records_to_table(
+                        "book", records=books, columns=BOOK_IMPORT_COLUMNS
                     )
+                except asyncpg.IntegrityConstraintViolationError as e:
+                    # Surface COPY failures like the executemany path does.
+                    raise IntegrityError("COPY book", None, e) from e
+                await CatalogVersionRepository.bump(db, "book")
+                await notify_change(db, "book_import", [])
+                return len(books), "copy"
 
-                await db.execute(query, book)
+        query = text("""
+            INSERT INTO book (title, genre, published_year, author_id)
+            VALUES (:title, :genre, :published_year, :author_id)
+        """)
+        await db.execute(query, [dict(zip(BOOK_IMPORT_COLUMNS, book)) for book in books])
+        await CatalogVersionRepository.bump(db, "book")
+        await notify_change(db, "book_import", [])
+        return len(books), "executemany"
 
-            await db.commit()
+    @staticmethod
+    async def upsert_books(
+        db: AsyncSession,
+        books: Sequence[tuple[str, str, int, int]],
+        conflict_columns: Sequence[str],
+        update_existing: bool = True,
+    ) -> tuple[int, list[int]]:
+        """
+        Inserts a batch of validated rows in one INSERT ... SELECT FROM unnest(...) with
+        ON CONFLICT on the natural key, in the current transaction. Existing books are
+        updated only when a column actually differs (or left alone with
+        `update_existing=False`), so re-importing unchanged rows writes nothing.
+        Returns the number of inserted books and the IDs of the updated ones.
+        The batch must not contain the same natural key twice.
+        """
+        if not books:
+            return 0, []
 
-        except Exception as e:
-            await db.rollback()
-            raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+        changed_columns = (
+            [column for column in BOOK_IMPORT_COLUMNS if column not in conflict_columns]
+            if update_existing
+            else []
+        )
+        conflict_action = "DO NOTHING"
+        if changed_columns:
+            assignments = ", ".join(f"{column} = EXCLUDED.{column}" for column in changed_columns)
+            differs = " OR ".join(f"book.{column} IS DISTINCT FROM EXCLUDED.{column}" for column in changed_columns)
+            conflict_action = f"DO UPDATE SET {assignments}, updated_at = now() WHERE {differs}"
+
+        query = text(f"""
+            INSERT INTO book (title, genre, published_year, author_id)
+            SELECT *
+            FROM unnest(
+                CAST(:titles AS varchar[]),
+                CAST(:genres AS varchar[]),
+                CAST(:published_years AS integer[]),
+                CAST(:author_ids AS integer[])
+            )
+            ON CONFLICT ({", ".join(conflict_columns)}) {conflict_action}
+            RETURNING id, (xmax = 0) AS inserted
+        """)
+        titles, genres, published_years, author_ids = zip(*books)
+        result = await db.execute(
+            query,
+            {
+                "titles": list(titles),
+                "genres": list(genres),
+                "published_years": list(published_years),
+                "author_ids": list(author_ids),
+            },
+        )
+        rows = result.fetchall()
+        inserted = sum(1 for row in rows if row.inserted)
+        updated_ids = [row.id for row in rows if not row.inserted]
+
+        if rows:
+            await CatalogVersionRepository.bump(db, "book")
+        if inserted:
+            await notify_change(db, "book_import", [])
+        if updated_ids:
+            await notify_change(db, "book", updated_ids)
+        return inserted, updated_ids
@@ -0,0 +1,78 @@
+from typing import Any, Sequence
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session, SessionTransaction
+
+from app.core.db import AsyncSession
+
+# Session info key mapping each (sub)transaction to the tables whose counters it changed.
+PENDING_BUMPS = "catalog_version_pending_bumps"
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_rolled_back_bumps(session: Session, previous_transaction: SessionTransaction) -> None:
+    """
+    Forgets the bumps recorded in a transaction or savepoint that was rolled back,
+    including those of savepoints released into it.
+    """
+    pending: dict[SessionTransaction, set[str]] = session.info.get(PENDING_BUMPS, {})
+    for transaction in list(pending):
+        ancestor: Any = transaction
+        while ancestor is not None and ancestor is not previous_transaction:
+            ancestor = ancestor.parent
+        if ancestor is previous_transaction:
+            del pending[transaction]
+
+
+class CatalogVersionRepository:
+    @staticmethod
+    async def bump(db: AsyncSession, *table_names: str) -> None:
+        """
+        Marks the given tables as changed by the session's current transaction (or
+        savepoint). Their counters are incremented by `apply_bumps` at the end of the
+        transaction, so the counter rows stay locked only while it commits.
+        """
+        session = db.sync_session
+        transaction = session.get_nested_transaction() or session.get_transaction()
+        db.info.setdefault(PENDING_BUMPS, {}).setdefault(transaction, set()).update(table_names)
+
+    @staticmethod
+    async def commit(db: AsyncSession) -> None:
+        """
+        Applies the pending counter bumps and commits them together with the change.
+        """
+        await CatalogVersionRepository.apply_bumps(db)
+        await db.commit()
+
+    @staticmethod
+    async def apply_bumps(db: AsyncSession) -> None:
+        """
+        Increments the counters of the tables marked by `bump` as the last statement of
+        the current transaction, creating a missing counter on first use. The counter
+        commits atomically with the change it tags, and concurrent writers only queue on
+        its row lock for the duration of a commit.
+        """
+        pending = db.info.pop(PENDING_BUMPS, None)
+        table_names = set().union(*pending.values()) if pending else set()
+        if not table_names:
+            return
+        query = text("""
+            INSERT INTO catalog_version (table_name, version)
+            SELECT table_name, 1 FROM unnest(CAST(:table_names AS varchar[])) AS table_name
+            ON CONFLICT (table_name) DO UPDATE SET version = catalog_version.version + 1
+        """)
+        # Sorted so that two sessions bumping several tables lock them in the same order.
+        await db.execute(query, {"table_names": sorted(table_names)})
+
+    @staticmethod
+    async def get_versions(db: AsyncSession, table_names: Sequence[str]) -> dict[str, int]:
+        """
+        Returns the current change counters of the given tables.
+        """
+        query = text("""
+            SELECT table_name, version
+            FROM catalog_version
+            WHERE table_name = ANY(:table_names)
+        """)
+        result = await db.execute(query, {"table_names": list(table_names)})
+        return {row[0]: row[1] for row in result.fetchall()}
@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from sqlalchemy import text
+
+from app.core.db import AsyncSession
+
+
+class RefreshTokenRepository:
+    @staticmethod
+    async def mark_used(db: AsyncSession, jti: str, user_id: int, expires_at: datetime) -> bool:
+        """
+        Records a refresh token ID as used and returns False if it already was. The
+        insert is atomic, so of two concurrent refreshes with the same token only one
+        wins. Rows of tokens that have since expired are purged on the way.
+        """
+        await db.execute(text("DELETE FROM used_refresh_token WHERE expires_at < now()"))
+        query = text("""
+            INSERT INTO used_refresh_token (jti, user_id, expires_at)
+            VALUES (:jti, :user_id, :expires_at)
+            ON CONFLICT (jti) DO NOTHING
+            RETURNING jti
+        """)
+        result = await db.execute(
+            query, {"jti": jti, "user_id": user_id, "expires_at": expires_at}
+        )
+        marked = result.fetchone() is not None
+        await db.commit()
+        return marked
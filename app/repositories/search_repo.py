@@ -0,0 +1,80 @@
+from typing import Any, Optional, Sequence
+
+from sqlalchemy import Row, text
+
+from app.core.db import AsyncSession
+
+# Must match the text search configuration of the generated search_vector columns.
+SEARCH_CONFIG = "english"
+HEADLINE_OPTIONS = "MaxFragments=2, MaxWords=30, MinWords=10"
+
+
+class SearchRepository:
+    @staticmethod
+    async def search(
+        db: AsyncSession,
+        query_text: str,
+        kinds: Sequence[str] = ("book", "author"),
+        limit: int = 20,
+        after: Optional[tuple[float, str, int]] = None,
+    ) -> Sequence[Row[Any]]:
+        """
+        Runs a ranked full-text search over book titles and author names/biographies
+        using the GIN-indexed search_vector columns, and returns one page of mixed hits
+        ordered by (rank desc, kind, id). Headline snippets are only built for the page.
+        One extra row is fetched so the caller can tell whether a next page exists.
+        """
+        hit_queries = []
+        if "book" in kinds:
+            hit_queries.append("""
+                SELECT 'book' AS kind, id, CAST(ts_rank(search_vector, q.query) AS float8) AS rank
+                FROM book, q
+                WHERE search_vector @@ q.query
+            """)
+        if "author" in kinds:
+            hit_queries.append("""
+                SELECT 'author' AS kind, id, CAST(ts_rank(search_vector, q.query) AS float8) AS rank
+                FROM author, q
+                WHERE search_vector @@ q.query
+            """)
+
+        params: dict[str, Any] = {"query_text": query_text, "limit": limit + 1}
+        seek_clause = ""
+        if after is not None:
+            seek_clause = """
+                WHERE rank < :after_rank
+                   OR (rank = :after_rank AND (kind, id) > (:after_kind, :after_id))
+            """
+            params["after_rank"], params["after_kind"], params["after_id"] = after
+
+        query = text(f"""
+            WITH q AS (
+                SELECT websearch_to_tsquery('{SEARCH_CONFIG}', :query_text) AS query
+            ),
+            hits AS (
+                {" UNION ALL ".join(hit_queries)}
+            ),
+            page AS (
+                SELECT kind, id, rank
+                FROM hits
+                {seek_clause}
+                ORDER BY rank DESC, kind, id
+                LIMIT :limit
+            )
+            SELECT
+                p.kind,
+                p.id,
+                COALESCE(b.title, a.name) AS title,
+                CASE
+                    WHEN p.kind = 'book' THEN ts_headline('{SEARCH_CONFIG}', b.title, q.query)
+                    ELSE ts_headline('{SEARCH_CONFIG}', a.biography, q.query, '{HEADLINE_OPTIONS}')
+                END AS snippet,
+                p.rank
+            FROM page p
+            CROSS JOIN q
+            LEFT JOIN book b ON p.kind = 'book' AND b.id = p.id
+            LEFT JOIN author a ON p.kind = 'author' AND a.id = p.id
+            ORDER BY p.rank DESC, p.kind, p.id
+        """)
+        result = await db.execute(query, params)
+        return result.fetchall()
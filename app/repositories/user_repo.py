@@ -19,6 +19,18 @@ class UserRepository:
         result = await db.execute(query, {"email": email})
         return result.fetchone()
 
+    @staticmethod
+    async def get_user_by_id(db: AsyncSession, user_id: int) -> Row[Any] | None:
+        """
+        Retrieves a user from the database by their ID, without the password hash.
+        """
+        query = text(
+            "SELECT id, username, email, first_name, last_name "
+            'FROM "user_data" WHERE id = :user_id'
+        )
+        result = await db.execute(query, {"user_id": user_id})
+        return result.fetchone()
+
     @staticmethod
     async def create_user(db: AsyncSession, user_data: dict) -> Any | None:
         """
@@ -36,3 +48,12 @@ class UserRepository:
         except IntegrityError:
             await db.rollback()
             return None
+
+    @staticmethod
+    async def update_password_hash(db: AsyncSession, user_id: int, hashed_password: str) -> None:
+        """
+        Replaces a user's stored password hash.
+        """
+        query = text('UPDATE "user_data" SET hashed_password = :hashed_password WHERE id = :user_id')
+        await db.execute(query, {"hashed_password": hashed_password, "user_id": user_id})
+        await db.commit()
@@ -21,3 +21,7 @@ class TokenDataSchema(BaseModel):
 class TokenResponseSchema(BaseModel):
     access_token: str
     refresh_token: str
+
+
+class RefreshTokenSchema(BaseModel):
+    refresh_token: str
@@ -1,5 +1,9 @@
+from typing import List, Optional
+
 from pydantic import BaseModel, Field
 
+from app.schemas.book_schemas import BookResponseSchema
+
 
 class AuthorBase(BaseModel):
     name: str = Field(..., min_length=2, max_length=100)
@@ -15,4 +19,20 @@ class AuthorResponse(AuthorBase):
     id: int
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class AuthorDetailResponse(AuthorResponse):
+    books: Optional[List[BookResponseSchema]] = None
+    book_count: Optional[int] = None
+
+
+class AuthorListItemResponse(BaseModel):
+    id: int
+    name: str
+    biography: Optional[str] = None
+    books: Optional[List[BookResponseSchema]] = None
+    book_count: Optional[int] = None
+
+    class Config:
+        from_attributes = True
@@ -1,5 +1,6 @@
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 from datetime import datetime
+from typing import Literal, Optional
 from app.models.book import ALLOWED_GENRES
 
 class BookCreateAndUpdateSchema(BaseModel):
@@ -39,4 +40,107 @@ class BookResponseSchema(BaseModel):
     author_id: int
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class BookBulkFilterSchema(BaseModel):
+    genre: Optional[str] = None
+    author_id: Optional[int] = None
+    published_year_min: Optional[int] = None
+    published_year_max: Optional[int] = None
+
+
+class BookBulkChangesSchema(BaseModel):
+    genre: Optional[str] = None
+    published_year: Optional[int] = None
+    author_id: Optional[int] = None
+
+    @field_validator("genre")
+    def genre_valid(cls, value):
+        if value is not None and value not in ALLOWED_GENRES:
+            raise ValueError(f"Invalid genre. Allowed genres: {', '.join(ALLOWED_GENRES)}")
+        return value
+
+    @field_validator("published_year")
+    def published_year_valid(cls, value):
+        current_year = datetime.now().year
+        if value is not None and not (1800 <= value <= current_year):
+            raise ValueError(f"Published year must be between 1800 and {current_year}")
+        return value
+
+
+class BookBulkDeleteSchema(BaseModel):
+    ids: Optional[list[int]] = Field(None, min_length=1, max_length=10_000)
+    filter: Optional[BookBulkFilterSchema] = None
+    dry_run: bool = False
+
+    @model_validator(mode="after")
+    def selection_required(self):
+        if self.ids is None and not (self.filter and self.filter.model_dump(exclude_none=True)):
+            raise ValueError("Select books by ids and/or a non-empty filter")
+        return self
+
+
+class BookBulkUpdateSchema(BookBulkDeleteSchema):
+    changes: BookBulkChangesSchema
+
+    @field_validator("changes")
+    def changes_not_empty(cls, value):
+        if not value.model_dump(exclude_none=True):
+            raise ValueError("At least one field must be changed")
+        return value
+
+
+class BookBulkResultSchema(BaseModel):
+    affected: int
+    dry_run: bool
+
+
+class BookBatchResponseSchema(BaseModel):
+    books: list[BookResponseSchema]
+    missing: list[int]
+
+
+class BookSearchResultSchema(BookResponseSchema):
+    score: float
+
+
+class AutocompleteSuggestionSchema(BaseModel):
+    kind: Literal["book", "author"]
+    id: int
+    text: str
+
+
+class ImportChunkTimingSchema(BaseModel):
+    chunk: int
+    rows: int
+    method: Optional[str] = None
+    seconds: float
+    rows_per_second: float
+
+
+class ImportRejectSchema(BaseModel):
+    row: int
+    reason: str
+
+
+class BookImportReportSchema(BaseModel):
+    message: str = "Books imported successfully"
+    rows_parsed: int = 0
+    rows_inserted: int = 0
+    rows_updated: int = 0
+    rows_skipped: int = 0
+    rows_rejected: int = 0
+    elapsed_seconds: float = 0.0
+    rows_per_second: float = 0.0
+    chunks: list[ImportChunkTimingSchema] = []
+    rejects: list[ImportRejectSchema] = []
+
+
+class ImportJobSchema(BaseModel):
+    job_id: str
+    status: str
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    progress: BookImportReportSchema
@@ -0,0 +1,11 @@
+from typing import Literal
+
+from pydantic import BaseModel
+
+
+class SearchHitSchema(BaseModel):
+    kind: Literal["book", "author"]
+    id: int
+    title: str
+    snippet: str
+    rank: float
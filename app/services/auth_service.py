@@ -1,27 +1,38 @@
-from datetime import datetime, timedelta
+import uuid
+from datetime import datetime, timedelta, timezone
 from typing import Any
 
-import bcrypt
-from jose import jwt
+from fastapi import HTTPException, status
+from jose import JWTError, jwt
 from sqlalchemy import Row
 
-from app.core.config import ALGORITHM, SECRET_KEY
+from app.core.config import ALGORITHM, REFRESH_TOKEN_ROTATION, SECRET_KEY
 from app.core.db import AsyncSession
+from app.core.security import invalidate_user_tokens, verify_and_update_password_async
+from app.repositories.refresh_token_repo import RefreshTokenRepository
 from app.repositories.user_repo import UserRepository
 
+REFRESH_TOKEN_LIFETIME = timedelta(days=7)
+
 
 async def authenticate_user(
     email: str, password: str, db: AsyncSession
 ) -> Row[Any] | None:
     """
-    Verifies user credentials against the database.
+    Verifies user credentials against the database, rehashing the stored password
+    when it was hashed with outdated settings.
     """
     user = await UserRepository.get_user_by_email(db, email)
-    if user and bcrypt.checkpw(
-        password.encode("utf-8"), user.hashed_password.encode("utf-8")
-    ):
-        return user
-    return None
+    if not user:
+        return None
+
+    verified, new_hash = await verify_and_update_password_async(password, user.hashed_password)
+    if not verified:
+        return None
+    if new_hash:
+        await UserRepository.update_password_hash(db, user.id, new_hash)
+        invalidate_user_tokens(user.id)
+    return user
 
 
 def create_access_token(user_id: int) -> str:
@@ -30,7 +41,7 @@ def create_access_token(user_id: int) -> str:
     """
     access_token_expires = timedelta(minutes=15)
     access_token = jwt.encode(
-        {"sub": str(user_id), "exp": datetime.utcnow() + access_token_expires},
+        {"sub": str(user_id), "type": "access", "exp": datetime.utcnow() + access_token_expires},
         SECRET_KEY,
         algorithm=ALGORITHM,
     )
@@ -41,10 +52,50 @@ def create_refresh_token(user_id: int) -> str:
     """
     Generates a refresh token that expires in 7 days.
     """
-    refresh_token_expires = timedelta(days=7)
     refresh_token = jwt.encode(
-        {"sub": user_id, "exp": datetime.utcnow() + refresh_token_expires},
+        {
+            "sub": str(user_id),
+            "type": "refresh",
+            "jti": uuid.uuid4().hex,
+            "exp": datetime.utcnow() + REFRESH_TOKEN_LIFETIME,
+        },
         SECRET_KEY,
         algorithm=ALGORITHM,
     )
     return refresh_token
+
+
+async def refresh_tokens(
+    refresh_token: str, db: AsyncSession, rotate: bool = REFRESH_TOKEN_ROTATION
+) -> dict[str, str]:
+    """
+    Issues a new access token for a valid refresh token without checking the password.
+    With rotation the refresh token is replaced by a new one and cannot be used again;
+    used token IDs are kept in the database until they expire, so reuse is detected
+    on every worker.
+    """
+    try:
+        payload = jwt.decode(refresh_token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token or expired"
+        )
+
+    token_id = payload.get("jti")
+    if payload.get("type") != "refresh" or not payload.get("sub") or not token_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token"
+        )
+
+    user = await UserRepository.get_user_by_id(db, int(payload["sub"]))
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+
+    if rotate:
+        expires_at = datetime.fromtimestamp(payload["exp"], tz=timezone.utc)
+        if not await RefreshTokenRepository.mark_used(db, token_id, user.id, expires_at):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token was already used"
+            )
+        refresh_token = create_refresh_token(user.id)
+    return {"access_token": create_access_token(user.id), "refresh_token": refresh_token}
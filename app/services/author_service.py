@@ -1,28 +1,100 @@
-from typing import Any, Sequence
+from typing import Any, Iterable, Optional, Sequence
 from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
+from app.core.cache import TTLCache, register_cache
+from app.core.config import AUTHOR_CACHE_SIZE, AUTHOR_CACHE_TTL
+from app.core.pagination import decode_cursor, encode_cursor
 from app.repositories.author_repo import AuthorRepository
+from app.repositories.book_repo import BookRepository
+from app.services.autocomplete_service import autocomplete_service
+from app.services.book_service import BookService
+
+author_cache = register_cache("author", TTLCache(maxsize=AUTHOR_CACHE_SIZE, ttl=AUTHOR_CACHE_TTL))
 
 
 class AuthorService:
     @staticmethod
     async def get_author_by_id(db: AsyncSession, author_id: int) -> Row[Any]:
         """
-        Fetches an author by ID from the repository.
+        Fetches an author by ID, from the author cache when possible.
         """
-        author = await AuthorRepository.get_author_by_id(db, author_id)
-        if not author:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Author was not found.")
+        author = author_cache.get(author_id)
+        if author is None:
+            author = await AuthorRepository.get_author_by_id(db, author_id)
+            if not author:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Author was not found.")
+            author_cache.set(author_id, author)
         return author
 
     @staticmethod
-    async def get_all_authors(db: AsyncSession) -> Sequence[Row[Any]]:
+    async def get_authors(
+        db: AsyncSession,
+        name: Optional[str] = None,
+        page: int = 1,
+        page_size: int = 50,
+        sort_by: str = "name",
+        sort_order: str = "asc",
+        include_biography: bool = True,
+    ) -> Sequence[Row[Any]]:
         """
-        Fetches all authors from the repository.
+        Fetches a page of authors with an optional name-prefix filter.
         """
-        return await AuthorRepository.get_all_authors(db)
+        return await AuthorRepository.get_authors(
+            db, name, page, page_size, sort_by, sort_order, include_biography
+        )
+
+    @staticmethod
+    async def get_authors_keyset(
+        db: AsyncSession,
+        name: Optional[str] = None,
+        page_size: int = 50,
+        sort_by: str = "name",
+        sort_order: str = "asc",
+        cursor: Optional[str] = None,
+        include_biography: bool = True,
+    ) -> tuple[Sequence[Row[Any]], Optional[str]]:
+        """
+        Fetches one page of authors using keyset pagination and returns it together
+        with the cursor of the next page, or None when this is the last page.
+        """
+        after = decode_cursor(cursor, sort_by, sort_order) if cursor else None
+        authors = await AuthorRepository.get_authors_keyset(
+            db, name, page_size, sort_by, sort_order, after, include_biography
+        )
+        if len(authors) <= page_size:
+            return authors, None
+
+        authors = authors[:page_size]
+        last = authors[-1]
+        next_cursor = encode_cursor(sort_by, sort_order, last._mapping[sort_by], last.id)
+        return authors, next_cursor
+
+    @staticmethod
+    async def attach_includes(
+        db: AsyncSession, authors: Sequence[Row[Any]], include: set[str], books_limit: int = 10
+    ) -> list[dict[str, Any]]:
+        """
+        Converts author rows to dicts and embeds their books and/or book counts,
+        fetching them for all authors at once instead of one query per author.
+        """
+        result = [dict(author._mapping) for author in authors]
+        author_ids = [author["id"] for author in result]
+
+        if "books" in include:
+            books_by_author: dict[int, list[Row[Any]]] = {author_id: [] for author_id in author_ids}
+            for book in await BookRepository.get_books_by_author_ids(db, author_ids, books_limit):
+                books_by_author[book.author_id].append(book)
+            for author in result:
+                author["books"] = books_by_author[author["id"]]
+
+        if "book_count" in include:
+            counts = await BookRepository.count_books_by_author_ids(db, author_ids)
+            for author in result:
+                author["book_count"] = counts.get(author["id"], 0)
+
+        return result
 
     @staticmethod
     async def create_author(db: AsyncSession, name: str, biography: str) -> Row[Any] | None:
@@ -32,7 +104,10 @@ class AuthorService:
         existing_author = await AuthorRepository.get_author_by_name(db, name)
         if existing_author:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Author with this name already exists.")
-        return await AuthorRepository.create_author(db, name, biography)
+        author = await AuthorRepository.create_author(db, name, biography)
+        if author:
+            autocomplete_service.record("author", author.id, author.name)
+        return author
 
     @staticmethod
     async def update_author(db: AsyncSession, author_id: int, name: str, biography: str) -> Row[Any] | None:
@@ -42,7 +117,11 @@ class AuthorService:
         author = await AuthorRepository.get_author_by_id(db, author_id)
         if not author:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Author was not found.")
-        return await AuthorRepository.update_author(db, author_id, name, biography)
+        updated = await AuthorRepository.update_author(db, author_id, name, biography)
+        author_cache.delete(author_id)
+        if updated:
+            autocomplete_service.record("author", updated.id, updated.name)
+        return updated
 
     @staticmethod
     async def delete_author(db: AsyncSession, author_id: int) -> Any:
@@ -52,4 +131,31 @@ class AuthorService:
         author = await AuthorRepository.get_author_by_id(db, author_id)
         if not author:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Author was not found.")
-        return await AuthorRepository.delete_author(db, author_id)
\ No newline at end of file
+        deleted = await AuthorRepository.delete_author(db, author_id)
+        AuthorService.invalidate_authors([author_id])
+        if deleted:
+            # The author's books were deleted with them; the index is rebuilt in the background.
+            autocomplete_service.forget("author", author_id)
+            autocomplete_service.schedule_load()
+        return deleted
+
+    @staticmethod
+    def apply_change_notification(author_ids: Optional[list[int]]) -> None:
+        """
+        Applies an author change notification from another worker; None flushes the
+        author cache together with the book cache, whose rows may have cascaded.
+        """
+        if author_ids is None:
+            author_cache.clear()
+            BookService.apply_change_notification(None)
+        else:
+            AuthorService.invalidate_authors(author_ids)
+
+    @staticmethod
+    def invalidate_authors(author_ids: Iterable[int]) -> None:
+        """
+        Evicts the given authors and their cascaded books from the caches.
+        """
+        for author_id in author_ids:
+            author_cache.delete(author_id)
+            BookService.invalidate_author_books(author_id)
@@ -0,0 +1,170 @@
+import asyncio
+import logging
+from typing import Any, Callable, Coroutine, Optional, Sequence
+
+from app.core.autocomplete import PrefixIndex, PreparedEntry
+from app.core.config import AUTOCOMPLETE_FETCH_SIZE
+from app.core.db import AsyncSessionLocal
+from app.repositories.autocomplete_repo import AUTOCOMPLETE_SOURCES, AutocompleteRepository, ScanPosition
+
+logger = logging.getLogger(__name__)
+
+
+class AutocompleteService:
+    """
+    Serves title and author-name suggestions from an in-memory prefix index, so lookups
+    never touch the database. The index is loaded at startup, updated directly by this
+    process's writes, and refreshed in the background from change notifications sent by
+    other workers. Refreshes are serialized so a full reload never races an update.
+    """
+
+    def __init__(self) -> None:
+        self.index = PrefixIndex()
+        self.loaded = False
+        self._books_scan_position: Optional[ScanPosition] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._tasks: set[asyncio.Task] = set()
+        self._load_pending = False
+        self._catch_up_pending = False
+
+    def suggest(self, prefix: str, limit: int = 10, kind: Optional[str] = None) -> list[tuple[str, int, str]]:
+        """
+        Returns up to `limit` (kind, id, label) suggestions starting with the prefix.
+        """
+        return self.index.search(prefix, limit, kind)
+
+    async def load(self) -> None:
+        """
+        Rebuilds the whole index from the database, yielding to the event loop between
+        fetched partitions and sorting everything once at the end.
+        """
+        async with self._get_lock():
+            self._load_pending = False
+            entries: list[PreparedEntry] = []
+            async with AsyncSessionLocal() as db:
+                position = await AutocompleteRepository.get_scan_position(db)
+                for kind in AUTOCOMPLETE_SOURCES:
+                    async for rows in AutocompleteRepository.stream_labels(
+                        db, kind, fetch_size=AUTOCOMPLETE_FETCH_SIZE
+                    ):
+                        entries.extend(self.index.prepare(kind, rows, only_changed=False))
+                        await asyncio.sleep(0)
+            self.index.replace(entries)
+            self._books_scan_position = position
+            self.loaded = True
+
+    async def catch_up(self) -> None:
+        """
+        Indexes the books written since the last load or catch-up, e.g. by a bulk import.
+        Books are selected by `updated_at` from the previous scan position, which also
+        covers transactions that were still open then, so a batch that allocated lower
+        IDs but committed later is not skipped. Unchanged rows seen again are skipped.
+        """
+        async with self._get_lock():
+            self._catch_up_pending = False
+            if self._books_scan_position is None:
+                return
+            async with AsyncSessionLocal() as db:
+                position = await AutocompleteRepository.get_scan_position(db)
+                async for rows in AutocompleteRepository.stream_labels(
+                    db, "book", self._books_scan_position, AUTOCOMPLETE_FETCH_SIZE
+                ):
+                    self.index.merge(self.index.prepare("book", rows))
+                    await asyncio.sleep(0)
+            self._books_scan_position = position
+
+    async def refresh(self, kind: str, ids: Sequence[int]) -> None:
+        """
+        Re-reads the given entries, re-indexing the ones that exist and dropping the rest.
+        Deleted authors take their books with them, so they trigger a full reload.
+        """
+        async with self._get_lock():
+            async with AsyncSessionLocal() as db:
+                rows = await AutocompleteRepository.get_labels(db, kind, ids)
+            existing = {row[0] for row in rows}
+            self.index.merge(self.index.prepare(kind, rows))
+            for entry_id in set(ids) - existing:
+                self.index.remove(kind, entry_id)
+        if kind == "author" and len(existing) < len(set(ids)):
+            self.schedule_load()
+
+    def record(self, kind: str, entry_id: int, label: str) -> None:
+        """
+        Indexes an entry created or updated by this process.
+        """
+        self.index.add(kind, entry_id, label)
+
+    def forget(self, kind: str, entry_id: int) -> None:
+        """
+        Drops an entry deleted by this process.
+        """
+        self.index.remove(kind, entry_id)
+
+    def schedule_load(self) -> None:
+        """
+        Schedules a full reload unless one is already waiting to run.
+        """
+        if not self._load_pending:
+            self._load_pending = True
+            self._schedule(self.load)
+
+    def schedule_catch_up(self) -> None:
+        """
+        Schedules a catch-up unless one is already waiting to run.
+        """
+        if not self._catch_up_pending:
+            self._catch_up_pending = True
+            self._schedule(self.catch_up)
+
+    def apply_book_change(self, book_ids: Optional[list[int]]) -> None:
+        """
+        Handles a book change notification; None means everything may have changed.
+        """
+        if book_ids is None:
+            self.schedule_load()
+        elif book_ids:
+            self._schedule(lambda: self.refresh("book", book_ids))
+
+    def apply_author_change(self, author_ids: Optional[list[int]]) -> None:
+        """
+        Handles an author change notification; None means everything may have changed.
+        """
+        if author_ids is None:
+            self.schedule_load()
+        elif author_ids:
+            self._schedule(lambda: self.refresh("author", author_ids))
+
+    def apply_book_import(self, _: Optional[list[int]]) -> None:
+        """
+        Handles a bulk import notification by catching up on newly inserted books.
+        """
+        self.schedule_catch_up()
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns the size and load state of the index.
+        """
+        return {
+            "loaded": self.loaded,
+            "size": len(self.index),
+            "books_scanned_since": self._books_scan_position[0] if self._books_scan_position else None,
+        }
+
+    def _get_lock(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    def _schedule(self, refresh: Callable[[], Coroutine[Any, Any, None]]) -> None:
+        task = asyncio.get_running_loop().create_task(self._run(refresh))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, refresh: Callable[[], Coroutine[Any, Any, None]]) -> None:
+        try:
+            await refresh()
+        except Exception:
+            logger.exception("Autocomplete index refresh failed")
+
+
+autocomplete_service = AutocompleteService()
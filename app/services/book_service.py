@@ -1,14 +1,53 @@
+import codecs
 import csv
+import io
 import json
-from io import StringIO
-from typing import Any, Optional, Sequence
+import re
+import zlib
+from typing import Any, AsyncIterator, Awaitable, Callable, Hashable, Iterable, Optional, Sequence, TypeVar
 
+import orjson
 from fastapi import HTTPException, UploadFile
 from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.db import AsyncSession
-from app.repositories.book_repo import BookRepository
+from app.core.cache import TTLCache, register_cache
+from app.core.config import (
+    BOOK_CACHE_SIZE,
+    BOOK_CACHE_TTL,
+    BOOK_COUNT_CACHE_SIZE,
+    BOOK_COUNT_CACHE_TTL,
+    EXPORT_FETCH_SIZE,
+    EXPORT_GZIP_LEVEL,
+    IMPORT_BATCH_SIZE,
+    IMPORT_MAX_RECORD_SIZE,
+    IMPORT_READ_CHUNK_SIZE,
+    TITLE_SEARCH_THRESHOLD,
+)
+from app.core.db import AsyncSession, AsyncSessionLocal
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.singleflight import SingleFlight
+from app.repositories.book_repo import AUTHOR_FOREIGN_KEY, NATURAL_KEY_CONSTRAINT, BookRepository
+from app.repositories.catalog_version_repo import CatalogVersionRepository
+from app.services.autocomplete_service import autocomplete_service
+
+IMPORT_CONTENT_TYPES = ("application/json", "application/x-ndjson", "text/csv")
+JSON_WHITESPACE = re.compile(r"\s*")
+JSON_ARRAY_SEPARATORS = re.compile(r"[\s,]*")
+EXPORT_FIELDS = ("id", "title", "genre", "published_year", "author_id")
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+T = TypeVar("T")
+
+# Book rows by ID, tagged with their author so an author delete can evict the cascaded books.
+book_cache = register_cache("book", TTLCache(maxsize=BOOK_CACHE_SIZE, ttl=BOOK_CACHE_TTL))
+# Estimated listing totals by (title, genre, author_id) filter.
+book_count_cache = register_cache(
+    "book_count", TTLCache(maxsize=BOOK_COUNT_CACHE_SIZE, ttl=BOOK_COUNT_CACHE_TTL)
+)
+
+# Identical book reads that arrive while one is in flight share its query and result.
+book_reads = SingleFlight()
 
 
 class BookService:
@@ -20,6 +59,9 @@ class BookService:
         book_data = await BookRepository.create_book(
             db, title, genre, published_year, author_id
         )
+        if book_data:
+            BookService.cache_book(book_data)
+            autocomplete_service.record("book", book_data.id, book_data.title)
         return book_data
 
     @staticmethod
@@ -32,56 +74,480 @@ class BookService:
         page_size: int = 10,
         sort_by: str = "title",
         sort_order: str = "asc",
+        count: Optional[str] = None,
+    ) -> tuple[Sequence[Row[Any]], Optional[int]]:
+        """
+        Retrieves books with optional filtering, pagination, and sorting, together with
+        the total number of matching books when `count` is "exact" or "estimate".
+        Concurrent identical requests share one query.
+        """
+        with_total = count == "exact"
+        key = (
+            "books", title or None, genre or None, author_id or None,
+            page, page_size, sort_by, sort_order, with_total,
+        )
+        books = await BookService._shared_read(
+            db, key,
+            lambda session: BookRepository.get_books(
+                session, title, genre, author_id, page, page_size, sort_by, sort_order, with_total
+            ),
+        )
+        return await BookService._resolve_total(db, books, count, title, genre, author_id)
+
+    @staticmethod
+    async def get_books_keyset(
+        db: AsyncSession,
+        title: Optional[str] = None,
+        genre: Optional[str] = None,
+        author_id: Optional[int] = None,
+        page_size: int = 10,
+        sort_by: str = "title",
+        sort_order: str = "asc",
+        cursor: Optional[str] = None,
+        count: Optional[str] = None,
+    ) -> tuple[Sequence[Row[Any]], Optional[str], Optional[int]]:
+        """
+        Retrieves one page of books using keyset pagination and returns it together
+        with the cursor of the next page, or None when this is the last page, and the
+        total number of matching books when `count` is "exact" or "estimate".
+        """
+        after = decode_cursor(cursor, sort_by, sort_order) if cursor else None
+        with_total = count == "exact"
+        key = (
+            "books_keyset", title or None, genre or None, author_id or None,
+            page_size, sort_by, sort_order, cursor, with_total,
+        )
+        books = await BookService._shared_read(
+            db, key,
+            lambda session: BookRepository.get_books_keyset(
+                session, title, genre, author_id, page_size, sort_by, sort_order, after, with_total
+            ),
+        )
+        books, total = await BookService._resolve_total(db, books, count, title, genre, author_id)
+        if len(books) <= page_size:
+            return books, None, total
+
+        books = books[:page_size]
+        last = books[-1]
+        next_cursor = encode_cursor(sort_by, sort_order, last._mapping[sort_by], last.id)
+        return books, next_cursor, total
+
+    @staticmethod
+    async def _resolve_total(
+        db: AsyncSession,
+        books: Sequence[Row[Any]],
+        count: Optional[str],
+        title: Optional[str],
+        genre: Optional[str],
+        author_id: Optional[int],
+    ) -> tuple[Sequence[Row[Any]], Optional[int]]:
+        """
+        Splits the exact total off rows fetched `with_total`, or looks up an estimate.
+        """
+        if count == "exact":
+            total = books[0].total_count if books else 0
+            return [book for book in books if book.id is not None], total
+        if count == "estimate":
+            return books, await BookService.estimate_book_count(db, title, genre, author_id)
+        return books, None
+
+    @staticmethod
+    async def estimate_book_count(
+        db: AsyncSession,
+        title: Optional[str] = None,
+        genre: Optional[str] = None,
+        author_id: Optional[int] = None,
+    ) -> int:
+        """
+        Estimates the number of books matching the filters without counting on every page:
+        the planner's row estimate for unfiltered listings, otherwise an exact count cached
+        per filter for a short TTL.
+        """
+        if not (title or genre or author_id):
+            estimate = await BookRepository.estimate_book_count(db)
+            if estimate is not None:
+                return estimate
+
+        key = (title or None, genre or None, author_id or None)
+        total = book_count_cache.get(key)
+        if total is None:
+            total = await BookService._shared_read(
+                db, ("book_count", *key),
+                lambda session: BookRepository.count_books(session, title, genre, author_id),
+            )
+            book_count_cache.set(key, total)
+        return total
+
+    @staticmethod
+    async def search_books(
+        db: AsyncSession,
+        term: str,
+        genre: Optional[str] = None,
+        author_id: Optional[int] = None,
+        limit: int = 10,
+        threshold: float = TITLE_SEARCH_THRESHOLD,
     ) -> Sequence[Row[Any]]:
         """
-        Retrieves books with optional filtering, pagination, and sorting.
+        Fuzzy title search ranked by trigram similarity.
+        Concurrent identical searches share one query.
         """
-        return await BookRepository.get_books(
-            db, title, genre, author_id, page, page_size, sort_by, sort_order
+        term = term.strip()
+        key = ("book_search", term, genre or None, author_id or None, limit, threshold)
+        return await BookService._shared_read(
+            db, key,
+            lambda session: BookRepository.search_books_by_title(
+                session, term, genre, author_id, limit, threshold
+            ),
         )
 
     @staticmethod
     async def get_book_by_id(db, book_id: int) -> Row[Any] | None:
         """
-        Retrieves a book by its ID from the repository.
+        Retrieves a book by its ID, from the book cache when possible.
+        """
+        book_data = book_cache.get(book_id)
+        if book_data is None:
+            book_data = await BookService._shared_read(
+                db, ("book", book_id), lambda session: BookRepository.get_book_by_id(session, book_id)
+            )
+            if book_data:
+                BookService.cache_book(book_data)
+        return book_data
+
+    @staticmethod
+    async def get_books_by_ids(db: AsyncSession, book_ids: Sequence[int]) -> tuple[list[Row[Any]], list[int]]:
+        """
+        Resolves many books at once, from the book cache when possible and with a single
+        query for the rest. Returns the books in request order (duplicates removed) and
+        the IDs that do not exist.
         """
-        return await BookRepository.get_book_by_id(db, book_id)
+        book_ids = list(dict.fromkeys(book_ids))
+        found = {book_id: book_cache.get(book_id) for book_id in book_ids}
+        uncached = [book_id for book_id, book in found.items() if book is None]
+        if uncached:
+            key = ("books_by_ids", tuple(sorted(uncached)))
+            books = await BookService._shared_read(
+                db, key, lambda session: BookRepository.get_books_by_ids(session, uncached)
+            )
+            for book in books:
+                BookService.cache_book(book)
+                found[book.id] = book
+
+        books = [found[book_id] for book_id in book_ids if found[book_id] is not None]
+        missing = [book_id for book_id in book_ids if found[book_id] is None]
+        return books, missing
+
+    @staticmethod
+    async def _shared_read(
+        db: AsyncSession, key: Hashable, query: Callable[[AsyncSession], Awaitable[T]]
+    ) -> T:
+        """
+        Runs a read through `book_reads` on a session owned by the shared call, so
+        coalesced callers never wait on, or outlive, another request's session.
+        The request session only ever reads before getting here (e.g. the catalog
+        versions behind an ETag), so its connection is released first: a request
+        never holds one pooled connection while waiting for another.
+        """
+        await db.close()
+
+        async def run() -> T:
+            async with AsyncSessionLocal() as session:
+                return await query(session)
+
+        return await book_reads.do(key, run)
+
+    @staticmethod
+    async def get_catalog_versions(db: AsyncSession, *table_names: str) -> tuple[int, ...]:
+        """
+        Returns the change counters of the given tables, used to tag list responses.
+        """
+        versions = await CatalogVersionRepository.get_versions(db, table_names)
+        return tuple(versions.get(table_name, 0) for table_name in table_names)
 
     @staticmethod
     async def update_book(db, book_id: int, title: str, genre: str, published_year: int, author_id: int) -> Row[Any] | None:
         """
-        Updates an existing book in the repository.
+        Updates an existing book in the repository. Returns None if the book does not
+        exist and raises 409 if the change collides with another book's natural key or
+        names an unknown author.
         """
-        return await BookRepository.update_book(
+        BookService.invalidate_books([book_id])
+        book_data = await BookRepository.update_book(
             db, book_id, title, genre, published_year, author_id
         )
+        if book_data:
+            BookService.cache_book(book_data)
+            autocomplete_service.record("book", book_data.id, book_data.title)
+        elif await BookRepository.get_book_by_id(db, book_id):
+            raise HTTPException(
+                status_code=409,
+                detail="Another book has the same title, author and year, or the author does not exist",
+            )
+        return book_data
 
     @staticmethod
     async def delete_book(db, book_id: int) -> Any:
         """
         Deletes a book by its ID from the repository.
         """
-        return await BookRepository.delete_book(db, book_id)
+        row_count = await BookRepository.delete_book(db, book_id)
+        BookService.invalidate_books([book_id])
+        if row_count:
+            autocomplete_service.forget("book", book_id)
+        return row_count
 
     @staticmethod
-    async def import_books_from_json(file: UploadFile) -> Any:
+    async def bulk_update_books(
+        db: AsyncSession, changes: dict[str, Any], criteria: dict[str, Any], dry_run: bool = False
+    ) -> int:
         """
-        Imports books from a JSON file.
+        Updates every book matching the criteria in one statement and returns how many
+        were (or, with `dry_run`, would be) affected.
+        """
+        if dry_run:
+            return await BookRepository.count_bulk_matches(db, **criteria)
+        book_ids, violated = await BookRepository.bulk_update_books(db, changes, **criteria)
+        if violated == NATURAL_KEY_CONSTRAINT:
+            raise HTTPException(
+                status_code=409, detail="The changes would give a book the same title, author and year as another"
+            )
+        if violated == AUTHOR_FOREIGN_KEY:
+            raise HTTPException(status_code=400, detail="Author does not exist")
+        if violated:
+            raise HTTPException(status_code=400, detail=f"The changes violate {violated}")
+        BookService.invalidate_books(book_ids)
+        return len(book_ids)
+
+    @staticmethod
+    async def bulk_delete_books(db: AsyncSession, criteria: dict[str, Any], dry_run: bool = False) -> int:
         """
-        content = await file.read()
+        Deletes every book matching the criteria in one statement and returns how many
+        were (or, with `dry_run`, would be) affected.
+        """
+        if dry_run:
+            return await BookRepository.count_bulk_matches(db, **criteria)
+        book_ids = await BookRepository.bulk_delete_books(db, **criteria)
+        BookService.invalidate_books(book_ids)
+        for book_id in book_ids:
+            autocomplete_service.forget("book", book_id)
+        return len(book_ids)
+
+    @staticmethod
+    def cache_book(book_data: Row[Any]) -> None:
+        """
+        Stores a book row in the book cache, tagged with its author.
+        """
+        book_cache.set(book_data.id, book_data, tags=(f"author:{book_data.author_id}",))
+
+    @staticmethod
+    def invalidate_books(book_ids: Iterable[int]) -> None:
+        """
+        Evicts the given books from the book cache.
+        """
+        for book_id in book_ids:
+            book_cache.delete(book_id)
+
+    @staticmethod
+    def apply_change_notification(book_ids: Optional[list[int]]) -> None:
+        """
+        Applies a book change notification from another worker; None flushes the cache.
+        """
+        if book_ids is None:
+            book_cache.clear()
+        else:
+            BookService.invalidate_books(book_ids)
+
+    @staticmethod
+    def invalidate_author_books(author_id: int) -> None:
+        """
+        Evicts every cached book of an author, e.g. after the author was deleted.
+        """
+        book_cache.invalidate_tag(f"author:{author_id}")
+
+    @staticmethod
+    async def _read_text_chunks(file: UploadFile, chunk_size: int) -> AsyncIterator[str]:
+        """
+        Reads an uploaded file in fixed-size chunks and decodes them incrementally as UTF-8.
+        The end of the file is signalled by a final empty string.
+        """
+        decoder = codecs.getincrementaldecoder("utf-8-sig")()
         try:
-            return json.loads(content)
-        except json.JSONDecodeError:
+            while chunk := await file.read(chunk_size):
+                if text := decoder.decode(chunk):
+                    yield text
+            decoder.decode(b"", final=True)
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail="File must be UTF-8 encoded")
+        yield ""
+
+    @staticmethod
+    def _split_csv_records(buffer: str) -> tuple[list[str], str]:
+        """
+        Splits complete CSV records off the buffer, keeping newlines inside quoted
+        fields together, and returns them with the unfinished remainder.
+        """
+        records = []
+        start = position = quotes = 0
+        while (newline := buffer.find("\n", position)) != -1:
+            quotes += buffer.count('"', position, newline)
+            position = newline + 1
+            if quotes % 2 == 0:
+                records.append(buffer[start:position])
+                start = position
+                quotes = 0
+        return records, buffer[start:]
+
+    @staticmethod
+    async def stream_books_from_csv(
+        file: UploadFile, batch_size: int = IMPORT_BATCH_SIZE
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """
+        Parses a CSV file row by row and yields books in batches of `batch_size`,
+        so memory use is bounded by the batch size rather than the file size.
+        """
+        header: list[str] | None = None
+        batch: list[dict[str, Any]] = []
+        pending = ""
+
+        async for text in BookService._read_text_chunks(file, IMPORT_READ_CHUNK_SIZE):
+            pending += text
+            records, pending = BookService._split_csv_records(pending)
+            if not text and pending:
+                records.append(pending)
+                pending = ""
+            if len(pending) > IMPORT_MAX_RECORD_SIZE:
+                raise HTTPException(status_code=400, detail="CSV record is too large")
+
+            try:
+                for values in csv.reader(records):
+                    if not values:
+                        continue
+                    if header is None:
+                        header = values
+                        continue
+                    batch.append(dict(zip(header, values)))
+                    if len(batch) >= batch_size:
+                        yield batch
+                        batch = []
+            except csv.Error as e:
+                raise HTTPException(status_code=400, detail=f"Error parsing CSV file: {e}")
+
+        if batch:
+            yield batch
+
+    @staticmethod
+    async def stream_books_from_json(
+        file: UploadFile, batch_size: int = IMPORT_BATCH_SIZE
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """
+        Parses either a JSON array or newline-delimited JSON item by item and yields
+        books in batches of `batch_size` without loading the whole document.
+        """
+        decoder = json.JSONDecoder()
+        batch: list[dict[str, Any]] = []
+        buffer = ""
+        in_array: bool | None = None
+        array_closed = False
+
+        async for text in BookService._read_text_chunks(file, IMPORT_READ_CHUNK_SIZE):
+            buffer += text
+            position = 0
+            while True:
+                position = (JSON_ARRAY_SEPARATORS if in_array else JSON_WHITESPACE).match(
+                    buffer, position
+                ).end()
+                if position == len(buffer):
+                    break
+                if array_closed:
+                    raise HTTPException(status_code=400, detail="Invalid JSON format")
+                if in_array is None:
+                    in_array = buffer[position] == "["
+                    if in_array:
+                        position += 1
+                    continue
+                if in_array and buffer[position] == "]":
+                    array_closed = True
+                    position += 1
+                    continue
+                try:
+                    item, position = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if not text or len(buffer) - position > IMPORT_MAX_RECORD_SIZE:
+                        raise HTTPException(status_code=400, detail="Invalid JSON format")
+                    break
+                batch.append(item)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            buffer = buffer[position:]
+
+        if in_array and not array_closed:
             raise HTTPException(status_code=400, detail="Invalid JSON format")
+        if batch:
+            yield batch
 
     @staticmethod
-    async def import_books_from_csv(file: UploadFile) -> list[dict[str | Any, str | Any]]:
+    def stream_books(
+        file: UploadFile, content_type: Optional[str], batch_size: int = IMPORT_BATCH_SIZE
+    ) -> AsyncIterator[list[dict[str, Any]]]:
         """
-        Imports books from a CSV file.
+        Picks the streaming parser matching the upload's content type.
         """
-        content = await file.read()
-        try:
-            csv_reader = csv.DictReader(StringIO(content.decode("utf-8")))
-            return [row for row in csv_reader]
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Error parsing CSV file: {e}")
+        if content_type in ("application/json", "application/x-ndjson"):
+            return BookService.stream_books_from_json(file, batch_size)
+        if content_type == "text/csv":
+            return BookService.stream_books_from_csv(file, batch_size)
+        raise HTTPException(
+            status_code=400, detail="Invalid file type. Only JSON and CSV are allowed."
+        )
+
+    @staticmethod
+    def _encode_csv(rows: Sequence[Sequence[Any]]) -> bytes:
+        """
+        Encodes rows as CSV lines.
+        """
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows(rows)
+        return buffer.getvalue().encode("utf-8")
+
+    @staticmethod
+    def _encode_ndjson(rows: Sequence[Sequence[Any]]) -> bytes:
+        """
+        Encodes rows as newline-delimited JSON objects.
+        """
+        return b"".join(orjson.dumps(dict(zip(EXPORT_FIELDS, row))) + b"\n" for row in rows)
+
+    @staticmethod
+    async def export_books(
+        export_format: str = "csv",
+        title: Optional[str] = None,
+        genre: Optional[str] = None,
+        author_id: Optional[int] = None,
+        sort_by: str = "id",
+        sort_order: str = "asc",
+        compress: bool = False,
+    ) -> AsyncIterator[bytes]:
+        """
+        Streams the matching books as CSV or NDJSON, one encoded chunk per cursor fetch,
+        optionally gzip-compressed on the fly. Uses its own session because the response
+        body is still being produced after the request's dependencies have been closed.
+        """
+        encode = BookService._encode_csv if export_format == "csv" else BookService._encode_ndjson
+        compressor = zlib.compressobj(EXPORT_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if compress else None
+
+        def emit(data: bytes) -> bytes:
+            return compressor.compress(data) if compressor else data
+
+        if export_format == "csv":
+            yield emit(BookService._encode_csv([EXPORT_FIELDS]))
+
+        async with AsyncSessionLocal() as db:
+            async for rows in BookRepository.stream_books(
+                db, title, genre, author_id, sort_by, sort_order, EXPORT_FETCH_SIZE
+            ):
+                chunk = emit(encode(rows))
+                if chunk:
+                    yield chunk
+
+        if compressor:
+            yield compressor.flush()
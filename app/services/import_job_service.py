@@ -0,0 +1,153 @@
+import asyncio
+import os
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import HTTPException, UploadFile
+
+from app.core.config import (
+    IMPORT_MAX_JOBS,
+    IMPORT_MAX_WORKERS,
+    IMPORT_READ_CHUNK_SIZE,
+    IMPORT_SPOOL_DIR,
+)
+from app.core.db import AsyncSessionLocal
+from app.schemas.book_schemas import BookImportReportSchema, ImportJobSchema
+from app.services.book_service import IMPORT_CONTENT_TYPES, BookService
+from app.services.import_service import BookImportService
+
+
+class ImportJobService:
+    """
+    Runs book imports in the background on a bounded pool of workers. Uploads are
+    spooled to local disk first, so job state and files are local to this process.
+    """
+
+    def __init__(self, max_workers: int = IMPORT_MAX_WORKERS, max_jobs: int = IMPORT_MAX_JOBS) -> None:
+        self._jobs: OrderedDict[str, ImportJobSchema] = OrderedDict()
+        self._tasks: set[asyncio.Task] = set()
+        self._max_workers = max_workers
+        self._max_jobs = max_jobs
+        self._workers: Optional[asyncio.Semaphore] = None
+
+    async def submit(
+        self, file: UploadFile, batch_size: int, mode: str = "insert", on_error: str = "abort"
+    ) -> ImportJobSchema:
+        """
+        Spools the upload to disk and schedules its import, returning the queued job.
+        """
+        if file.content_type not in IMPORT_CONTENT_TYPES:
+            raise HTTPException(
+                status_code=400, detail="Invalid file type. Only JSON and CSV are allowed."
+            )
+        job = ImportJobSchema(
+            job_id=uuid.uuid4().hex,
+            status="queued",
+            created_at=datetime.now(timezone.utc),
+            progress=BookImportReportSchema(message="Import queued"),
+        )
+        path = await self._spool(file, job.job_id)
+
+        self._jobs[job.job_id] = job
+        self._prune()
+
+        if self._workers is None:
+            self._workers = asyncio.Semaphore(self._max_workers)
+        task = asyncio.create_task(
+            self._run(job, path, file.content_type, batch_size, mode, on_error)
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def get(self, job_id: str) -> Optional[ImportJobSchema]:
+        """
+        Returns the job with the given ID, if it is still known to this process.
+        """
+        return self._jobs.get(job_id)
+
+    def get_rejects_path(self, job_id: str) -> Optional[str]:
+        """
+        Returns the path of the job's rejects CSV once the job has finished, if it kept one.
+        """
+        job = self._jobs.get(job_id)
+        path = self._rejects_path(job_id)
+        if job is None or job.status not in ("completed", "failed") or not os.path.exists(path):
+            return None
+        return path
+
+    @staticmethod
+    def _rejects_path(job_id: str) -> str:
+        return os.path.join(IMPORT_SPOOL_DIR, f"{job_id}.rejects.csv")
+
+    async def _spool(self, file: UploadFile, job_id: str) -> str:
+        """
+        Copies the uploaded file to the spool directory chunk by chunk.
+        """
+        os.makedirs(IMPORT_SPOOL_DIR, exist_ok=True)
+        path = os.path.join(IMPORT_SPOOL_DIR, f"{job_id}.upload")
+        with open(path, "wb") as spool:
+            while chunk := await file.read(IMPORT_READ_CHUNK_SIZE):
+                await asyncio.to_thread(spool.write, chunk)
+        return path
+
+    async def _run(
+        self,
+        job: ImportJobSchema,
+        path: str,
+        content_type: Optional[str],
+        batch_size: int,
+        mode: str,
+        on_error: str,
+    ) -> None:
+        """
+        Imports a spooled file once a worker slot is free and records the outcome on the job.
+        When rows are skipped on error, every reject is kept in a CSV next to the spool file.
+        """
+        try:
+            async with self._workers:  # type: ignore[union-attr]
+                job.status = "running"
+                job.started_at = datetime.now(timezone.utc)
+                job.progress.message = "Import running"
+                rejects_path = self._rejects_path(job.job_id) if on_error == "skip" else os.devnull
+                with open(path, "rb") as spooled, open(rejects_path, "w", newline="") as rejects:
+                    upload = UploadFile(spooled)
+                    async with AsyncSessionLocal() as db:
+                        await BookImportService.import_books(
+                            db,
+                            BookService.stream_books(upload, content_type, batch_size),
+                            report=job.progress,
+                            mode=mode,
+                            on_error=on_error,
+                            rejects_file=rejects,
+                        )
+                job.status = "completed"
+                job.progress.message = "Books imported successfully"
+        except HTTPException as e:
+            job.status = "failed"
+            job.error = str(e.detail["message"] if isinstance(e.detail, dict) else e.detail)
+            job.progress.message = "Import failed"
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            job.progress.message = "Import failed"
+        finally:
+            job.finished_at = datetime.now(timezone.utc)
+            os.remove(path)
+
+    def _prune(self) -> None:
+        """
+        Forgets the oldest finished jobs once more than `max_jobs` are tracked.
+        """
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self._max_jobs:
+                break
+            if self._jobs[job_id].status in ("completed", "failed"):
+                del self._jobs[job_id]
+                if os.path.exists(self._rejects_path(job_id)):
+                    os.remove(self._rejects_path(job_id))
+
+
+import_job_service = ImportJobService()
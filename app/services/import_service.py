@@ -0,0 +1,387 @@
+import csv
+import time
+from datetime import datetime
+from typing import Any, AsyncIterable, Optional, Sequence, TextIO
+
+from fastapi import HTTPException
+from sqlalchemy import Row
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from app.core.config import IMPORT_INSERT_METHOD, IMPORT_MAX_REPORTED_REJECTS
+from app.core.db import AsyncSession
+from app.models.book import ALLOWED_GENRES, BOOK_NATURAL_KEY
+from app.repositories.author_repo import AuthorRepository
+from app.repositories.book_repo import (
+    AUTHOR_FOREIGN_KEY,
+    BOOK_IMPORT_COLUMNS,
+    NATURAL_KEY_CONSTRAINT,
+    BookRepository,
+)
+from app.repositories.catalog_version_repo import CatalogVersionRepository
+from app.schemas.book_schemas import (
+    BookImportReportSchema,
+    ImportChunkTimingSchema,
+    ImportRejectSchema,
+)
+from app.services.autocomplete_service import autocomplete_service
+from app.services.book_service import BookService
+
+GENRES = frozenset(ALLOWED_GENRES)
+MIN_PUBLISHED_YEAR = 1800
+
+AUTHOR_NAME_LENGTH = (2, 100)
+MAX_AUTHOR_ID = 2**31 - 1
+
+BookRow = tuple[str, str, int, int]
+# A validated row whose author is still an ID or a name to be resolved.
+ParsedBookRow = tuple[str, str, int, int | str]
+
+
+class BookImportService:
+    @staticmethod
+    def validate_batch(
+        batch: list[dict[str, Any]], first_row: int = 1
+    ) -> tuple[list[tuple[int, ParsedBookRow]], list[ImportRejectSchema]]:
+        """
+        Validates and normalizes a batch of raw book rows. Returns the valid rows as
+        (row number, tuple) pairs and a reject for every invalid row; rows are numbered
+        from `first_row`. A row names its author by `author_id` or, failing that, by
+        `author_name`, which is kept as a string until `resolve_authors` runs.
+        """
+        max_year = datetime.now().year
+        books = []
+        rejects = []
+        for row, book in enumerate(batch, start=first_row):
+            if not isinstance(book, dict):
+                rejects.append(ImportRejectSchema(row=row, reason="Each book must be an object"))
+                continue
+            try:
+                title = BookImportService._parse_str(book, "title")
+                genre = BookImportService._parse_str(book, "genre")
+                published_year = BookImportService._parse_int(book, "published_year")
+                author: int | str
+                if book.get("author_id") not in (None, ""):
+                    author = BookImportService._parse_int(book, "author_id")
+                elif book.get("author_name") not in (None, ""):
+                    author = BookImportService._parse_str(book, "author_name")
+                else:
+                    raise KeyError("author_id or author_name")
+            except KeyError as e:
+                rejects.append(ImportRejectSchema(row=row, reason=f"Missing field: {e.args[0]}"))
+                continue
+            except ValueError as e:
+                rejects.append(ImportRejectSchema(row=row, reason=str(e)))
+                continue
+
+            if not title:
+                reason = "Title cannot be empty"
+            elif genre not in GENRES:
+                reason = f"Invalid genre: {genre}"
+            elif not MIN_PUBLISHED_YEAR <= published_year <= max_year:
+                reason = f"published_year must be between {MIN_PUBLISHED_YEAR} and {max_year}"
+            elif isinstance(author, int) and not 1 <= author <= MAX_AUTHOR_ID:
+                reason = f"Author ID {author} does not exist"
+            elif isinstance(author, str) and not (
+                AUTHOR_NAME_LENGTH[0] <= len(author) <= AUTHOR_NAME_LENGTH[1]
+            ):
+                reason = "author_name must be between {} and {} characters".format(*AUTHOR_NAME_LENGTH)
+            else:
+                books.append((row, (title, genre, published_year, author)))
+                continue
+            rejects.append(ImportRejectSchema(row=row, reason=reason))
+        return books, rejects
+
+    @staticmethod
+    def _parse_str(book: dict[str, Any], field: str) -> str:
+        """
+        Returns a string field stripped of surrounding whitespace. A missing or null
+        value raises KeyError and any other non-string value raises ValueError.
+        """
+        value = book.get(field)
+        if value is None:
+            raise KeyError(field)
+        if not isinstance(value, str):
+            raise ValueError(f"{field} must be a string")
+        return value.strip()
+
+    @staticmethod
+    def _parse_int(book: dict[str, Any], field: str) -> int:
+        """
+        Returns an integer field given as a JSON integer or a string of digits (as CSV
+        yields). A missing or null value raises KeyError; booleans, floats and other
+        values raise ValueError.
+        """
+        value = book.get(field)
+        if value is None:
+            raise KeyError(field)
+        if isinstance(value, str) and value.strip().lstrip("+-").isdigit():
+            return int(value)
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+        raise ValueError(f"{field} must be an integer")
+
+    @staticmethod
+    async def resolve_authors(
+        db: AsyncSession, books: list[tuple[int, ParsedBookRow]]
+    ) -> tuple[list[tuple[int, BookRow]], list[ImportRejectSchema], list[Row[Any]]]:
+        """
+        Resolves the authors of a validated batch with at most one lookup for the IDs
+        and one for the names. Authors given by name that do not exist yet are created
+        in the current transaction. Returns the rows with author IDs, a reject for every
+        row whose author ID does not exist, and the created authors.
+        """
+        author_ids = {book[3] for _, book in books if isinstance(book[3], int)}
+        author_names = {book[3] for _, book in books if isinstance(book[3], str)}
+        existing = await BookRepository.get_existing_author_ids(db, author_ids) if author_ids else set()
+        by_name, created = (
+            await AuthorRepository.get_or_create_authors(db, author_names) if author_names else ({}, [])
+        )
+
+        valid = []
+        rejects = []
+        for row, (title, genre, published_year, author) in books:
+            if isinstance(author, str):
+                valid.append((row, (title, genre, published_year, by_name[author])))
+            elif author in existing:
+                valid.append((row, (title, genre, published_year, author)))
+            else:
+                rejects.append(ImportRejectSchema(row=row, reason=f"Author ID {author} does not exist"))
+        return valid, rejects, created
+
+    @staticmethod
+    def dedupe_batch(books: list[BookRow], natural_key: Sequence[str] = BOOK_NATURAL_KEY) -> list[BookRow]:
+        """
+        Drops earlier rows of a batch that share a natural key with a later row, so the
+        last occurrence wins as it would have if the rows had been imported one by one.
+        """
+        positions = [BOOK_IMPORT_COLUMNS.index(column) for column in natural_key]
+        unique = {tuple(book[position] for position in positions): book for book in books}
+        return list(unique.values())
+
+    @staticmethod
+    async def import_books(
+        db: AsyncSession,
+        batches: AsyncIterable[list[dict[str, Any]]],
+        method: str = IMPORT_INSERT_METHOD,
+        report: Optional[BookImportReportSchema] = None,
+        mode: str = "insert",
+        on_error: str = "abort",
+        rejects_file: Optional[TextIO] = None,
+    ) -> BookImportReportSchema:
+        """
+        Validates and writes parsed batches one by one, committing after every batch so
+        no transaction stays open for the whole import, and reports the throughput.
+        The given report, if any, is updated in place after every batch.
+
+        `mode="insert"` adds every row; a row whose natural key already exists fails its
+        batch. `mode="upsert"` updates existing books whose other columns changed and
+        `mode="ignore"` leaves them alone; in both, unchanged rows are counted as skipped,
+        so re-running an import is safe.
+
+        With `on_error="abort"` the first invalid row stops the import. With
+        `on_error="skip"` invalid rows are rejected and the valid rows of every batch are
+        still committed; rejects are listed in the report (up to
+        IMPORT_MAX_REPORTED_REJECTS) and, if given, all of them are written to
+        `rejects_file` as CSV.
+        """
+        report = report if report is not None else BookImportReportSchema()
+        started = time.perf_counter()
+        rejects_writer = csv.writer(rejects_file) if rejects_file is not None else None
+        if rejects_writer:
+            rejects_writer.writerow(["row", "reason"])
+
+        def reject(rejects: list[ImportRejectSchema]) -> None:
+            if not rejects:
+                return
+            if on_error == "abort":
+                raise HTTPException(
+                    status_code=400, detail=f"Row {rejects[0].row}: {rejects[0].reason}"
+                )
+            report.rows_rejected += len(rejects)
+            room = IMPORT_MAX_REPORTED_REJECTS - len(report.rejects)
+            report.rejects.extend(rejects[:room])
+            if rejects_writer:
+                rejects_writer.writerows((item.row, item.reason) for item in rejects)
+
+        batch_iterator = aiter(batches)
+        while True:
+            # Parse errors surface while reading the next batch, after earlier ones committed.
+            try:
+                batch = await anext(batch_iterator)
+            except StopAsyncIteration:
+                break
+            except HTTPException as e:
+                raise BookImportService._import_error(e.status_code, e.detail, report)
+            parsed: list[tuple[int, ParsedBookRow]] = []
+            books: list[tuple[int, BookRow]] = []
+            created: list[Row[Any]] = []
+            rejects: list[ImportRejectSchema] = []
+            unknown: list[ImportRejectSchema] = []
+            chunk_started = time.perf_counter()
+            first_row = report.rows_parsed + 1
+            report.rows_parsed += len(batch)
+            try:
+                parsed, rejects = BookImportService.validate_batch(batch, first_row)
+                if parsed:
+                    books, unknown, created = await BookImportService.resolve_authors(db, parsed)
+                    rejects = sorted(rejects + unknown, key=lambda item: item.row)
+                if on_error == "abort":
+                    reject(rejects)
+
+                rows = [book for _, book in books]
+                inserted, updated_ids, write_method = await BookImportService._write_batch(
+                    db, rows, method, mode
+                )
+                await CatalogVersionRepository.commit(db)
+            except HTTPException as e:
+                await db.rollback()
+                report.rows_rejected += len(batch)
+                raise BookImportService._import_error(e.status_code, e.detail, report)
+            except IntegrityError:
+                await db.rollback()
+                if on_error == "abort":
+                    report.rows_rejected += len(batch)
+                    raise BookImportService._import_error(
+                        409,
+                        "Batch contains books that already exist; import with mode=upsert or mode=ignore",
+                        report,
+                    )
+                # Only some rows conflict: redo the batch row by row to reject just those.
+                # Rows with an unknown author are already rejected and are left out.
+                unknown_rows = {item.row for item in unknown}
+                try:
+                    rows, row_rejects, inserted, updated_ids, created = (
+                        await BookImportService._write_rows_individually(
+                            db, [item for item in parsed if item[0] not in unknown_rows], mode
+                        )
+                    )
+                    await CatalogVersionRepository.commit(db)
+                except SQLAlchemyError as e:
+                    await db.rollback()
+                    report.rows_rejected += len(batch)
+                    raise BookImportService._import_error(500, f"Database error: {str(e)}", report)
+                write_method = "row_by_row"
+                rejects = sorted(rejects + row_rejects, key=lambda item: item.row)
+            except SQLAlchemyError as e:
+                await db.rollback()
+                report.rows_rejected += len(batch)
+                raise BookImportService._import_error(500, f"Database error: {str(e)}", report)
+            reject(rejects)
+
+            BookService.invalidate_books(updated_ids)
+            for author in created:
+                autocomplete_service.record("author", author.id, author.name)
+            chunk_seconds = time.perf_counter() - chunk_started
+            report.rows_inserted += inserted
+            report.rows_updated += len(updated_ids)
+            report.rows_skipped += len(rows) - inserted - len(updated_ids)
+            report.chunks.append(
+                ImportChunkTimingSchema(
+                    chunk=len(report.chunks) + 1,
+                    rows=len(rows),
+                    method=write_method,
+                    seconds=round(chunk_seconds, 4),
+                    rows_per_second=round(len(rows) / chunk_seconds, 1) if chunk_seconds else 0.0,
+                )
+            )
+            BookImportService._update_throughput(report, started)
+            autocomplete_service.schedule_catch_up()
+
+        if not report.rows_parsed:
+            raise BookImportService._import_error(400, "No books to import", report)
+
+        BookImportService._update_throughput(report, started)
+        return report
+
+    @staticmethod
+    async def _write_batch(
+        db: AsyncSession, rows: list[BookRow], method: str, mode: str
+    ) -> tuple[int, list[int], str]:
+        """
+        Writes a batch of rows in the current transaction according to the import mode
+        and returns the number of inserted books, the IDs of the updated ones and the
+        write method actually used.
+        """
+        if mode == "insert":
+            inserted, write_method = await BookRepository.bulk_insert_books(db, rows, method)
+            return inserted, [], write_method
+        if not rows:
+            return 0, [], "upsert"
+        inserted, updated_ids = await BookRepository.upsert_books(
+            db,
+            BookImportService.dedupe_batch(rows),
+            BOOK_NATURAL_KEY,
+            update_existing=mode == "upsert",
+        )
+        return inserted, updated_ids, "upsert"
+
+    @staticmethod
+    async def _write_rows_individually(
+        db: AsyncSession, parsed: list[tuple[int, ParsedBookRow]], mode: str
+    ) -> tuple[list[BookRow], list[ImportRejectSchema], int, list[int], list[Row[Any]]]:
+        """
+        Writes a batch whose bulk write hit a constraint violation one row at a time,
+        each under a savepoint, so only the violating rows are rejected. Takes the rows
+        whose authors resolved; they are resolved again, since the failed attempt rolled
+        back the authors it created.
+        Returns the written rows, the rejects, the number of inserted books, the IDs of
+        the updated ones and the created authors.
+        """
+        books, rejects, created = await BookImportService.resolve_authors(db, parsed)
+        written = []
+        inserted = 0
+        updated_ids: list[int] = []
+        for row, book in books:
+            try:
+                async with db.begin_nested():
+                    row_inserted, row_updated_ids, _ = await BookImportService._write_batch(
+                        db, [book], "executemany", mode
+                    )
+            except IntegrityError as e:
+                rejects.append(
+                    ImportRejectSchema(row=row, reason=BookImportService._integrity_reason(e, book))
+                )
+                continue
+            written.append(book)
+            inserted += row_inserted
+            updated_ids.extend(row_updated_ids)
+        return written, sorted(rejects, key=lambda item: item.row), inserted, updated_ids, created
+
+    @staticmethod
+    def _integrity_reason(error: IntegrityError, book: BookRow) -> str:
+        """
+        Describes why the database rejected a single book row.
+        """
+        constraint = BookRepository.violated_constraint(error)
+        if constraint == NATURAL_KEY_CONSTRAINT:
+            return "Book already exists; import with mode=upsert or mode=ignore"
+        if constraint == AUTHOR_FOREIGN_KEY:
+            return f"Author ID {book[3]} does not exist"
+        return f"Rejected by the database: {constraint or error.orig}"
+
+    @staticmethod
+    def _import_error(status_code: int, message: Any, report: BookImportReportSchema) -> HTTPException:
+        """
+        Builds the error of a failed import. Batches before the failing one stay
+        committed, so the error carries the report of what was already written.
+        """
+        report.message = "Import failed"
+        return HTTPException(
+            status_code=status_code,
+            detail={
+                "message": message,
+                "rows_committed": report.rows_inserted + report.rows_updated,
+                "last_committed_chunk": report.chunks[-1].chunk if report.chunks else None,
+                "report": report.model_dump(mode="json"),
+            },
+        )
+
+    @staticmethod
+    def _update_throughput(report: BookImportReportSchema, started: float) -> None:
+        """
+        Refreshes the elapsed time and overall rows/sec of an import report.
+        """
+        report.elapsed_seconds = round(time.perf_counter() - started, 4)
+        if report.elapsed_seconds:
+            processed = report.rows_inserted + report.rows_updated + report.rows_skipped
+            report.rows_per_second = round(processed / report.elapsed_seconds, 1)
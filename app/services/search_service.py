@@ -0,0 +1,42 @@
+from typing import Any, Optional, Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy import Row
+
+from app.core.db import AsyncSession
+from app.core.pagination import decode_cursor, encode_cursor
+from app.repositories.search_repo import SearchRepository
+
+
+class SearchService:
+    @staticmethod
+    async def search(
+        db: AsyncSession,
+        query_text: str,
+        kinds: Sequence[str] = ("book", "author"),
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> tuple[Sequence[Row[Any]], Optional[str]]:
+        """
+        Returns one page of ranked book/author hits and the cursor of the next page,
+        or None when this is the last page.
+        """
+        after = None
+        if cursor:
+            value, hit_id = decode_cursor(cursor, "rank", "desc")
+            if not (
+                isinstance(value, list)
+                and len(value) == 2
+                and isinstance(value[0], (int, float))
+                and value[1] in kinds
+            ):
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+            after = (value[0], value[1], hit_id)
+
+        hits = await SearchRepository.search(db, query_text, kinds, limit, after)
+        if len(hits) <= limit:
+            return hits, None
+
+        hits = hits[:limit]
+        last = hits[-1]
+        return hits, encode_cursor("rank", "desc", [last.rank, last.kind], last.id)
@@ -2,7 +2,7 @@ from typing import Any
 from fastapi import HTTPException
 
 from app.core.db import AsyncSession
-from app.core.security import hash_password
+from app.core.security import hash_password_async
 from app.repositories.user_repo import UserRepository
 from app.schemas.user_schema import UserCreateSchema
 
@@ -16,7 +16,7 @@ class UserService:
         existing_user =  await UserRepository.get_user_by_email(db, user_data.email)
         if existing_user:
             raise HTTPException(status_code=400, detail="Email already registered")
-        hashed_pw = hash_password(user_data.password)
+        hashed_pw = await hash_password_async(user_data.password)
         user_dict = user_data.dict()
         user_dict["hashed_password"] = hashed_pw
         del user_dict["password"]
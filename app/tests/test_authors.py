@@ -136,3 +136,39 @@ async def test_delete_author(register_user_and_get_token):
         headers={"Authorization": f"Bearer {token}"},
     )
     assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_get_authors_by_name_prefix(register_user_and_get_token):
+    token = await register_user_and_get_token
+    response = await AsyncClient().get(
+        "http://localhost:8000/author/",
+        params={"name": "Test", "include_biography": "false", "page_size": 5},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 200
+    assert len(response.json()) <= 5
+    for author in response.json():
+        assert author["name"].startswith("Test")
+        assert "biography" not in author
+
+
+@pytest.mark.asyncio
+async def test_get_author_with_books_and_count(register_user_and_get_token):
+    token = await register_user_and_get_token
+    author_data = {"name": "Included Author", "biography": "Biography of Included Author"}
+    response = await AsyncClient().post(
+        "http://localhost:8000/author/",
+        json=author_data,
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    author_id = response.json()["id"]
+
+    response = await AsyncClient().get(
+        f"http://localhost:8000/author/{author_id}",
+        params={"include": "books,book_count"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 200
+    assert response.json()["books"] == []
+    assert response.json()["book_count"] == 0
@@ -1,3 +1,6 @@
+import json
+import uuid
+
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient
@@ -115,6 +118,41 @@ async def test_update_book(register_user_and_get_token):
     assert response.json()["author"] == "New Author"
 
 
+@pytest.mark.asyncio
+async def test_update_book_to_existing_natural_key_conflicts(register_user_and_get_token):
+    token = await register_user_and_get_token
+    headers = {"Authorization": f"Bearer {token}"}
+    title = f"Natural Key {uuid.uuid4().hex[:8]}"
+    book_ids = []
+    for published_year in (2001, 2002):
+        response = await AsyncClient().post(
+            "http://localhost:8000/book",
+            json={"title": title, "genre": "Fiction", "published_year": published_year, "author_id": 1},
+            headers=headers,
+        )
+        book_ids.append(response.json()["id"])
+
+    response = await AsyncClient().put(
+        f"http://localhost:8000/book/{book_ids[1]}",
+        json={"title": title, "genre": "Fiction", "published_year": 2001, "author_id": 1},
+        headers=headers,
+    )
+    assert response.status_code == 409
+
+    response = await AsyncClient().patch(
+        "http://localhost:8000/book/bulk",
+        json={"ids": book_ids, "changes": {"published_year": 2003}},
+        headers=headers,
+    )
+    assert response.status_code == 409
+
+    response = await AsyncClient().patch(
+        "http://localhost:8000/book/bulk",
+        json={"ids": book_ids, "changes": {"author_id": 2147483647}},
+        headers=headers,
+    )
+    assert response.status_code == 400
+
 @pytest.mark.asyncio
 async def test_delete_book(register_user_and_get_token):
     token = await register_user_and_get_token
@@ -137,3 +175,329 @@ async def test_delete_book(register_user_and_get_token):
         headers={"Authorization": f"Bearer {token}"},
     )
     assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_get_books_cursor_pagination(register_user_and_get_token):
+    token = await register_user_and_get_token
+    response = await AsyncClient().get(
+        "http://localhost:8000/book",
+        params={"pagination": "cursor", "page_size": 1, "sort_by": "published_year"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 200
+    assert len(response.json()) <= 1
+
+    next_cursor = response.headers.get("X-Next-Cursor")
+    if next_cursor:
+        response = await AsyncClient().get(
+            "http://localhost:8000/book",
+            params={"cursor": next_cursor, "page_size": 1, "sort_by": "published_year"},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        assert response.status_code == 200
+
+    response = await AsyncClient().get(
+        "http://localhost:8000/book",
+        params={"cursor": "not-a-cursor"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_import_books_async_job(register_user_and_get_token):
+    token = await register_user_and_get_token
+    csv_data = "title,genre,published_year,author_id\nQueued Book,Fiction,2001,1\n"
+    response = await AsyncClient().post(
+        "http://localhost:8000/book/import",
+        params={"async": "true"},
+        files={"file": ("books.csv", csv_data, "text/csv")},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    response = await AsyncClient().get(
+        f"http://localhost:8000/book/import/{job_id}",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 200
+    assert response.json()["status"] in ("queued", "running", "completed", "failed")
+    assert "rows_parsed" in response.json()["progress"]
+
+
+@pytest.mark.asyncio
+async def test_get_books_conditional_request(register_user_and_get_token):
+    token = await register_user_and_get_token
+    headers = {"Authorization": f"Bearer {token}"}
+    response = await AsyncClient().get("http://localhost:8000/book", headers=headers)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    response = await AsyncClient().get(
+        "http://localhost:8000/book", headers={**headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+
+@pytest.mark.asyncio
+async def test_export_books_ndjson(register_user_and_get_token):
+    token = await register_user_and_get_token
+    response = await AsyncClient().get(
+        "http://localhost:8000/book/export?format=ndjson&gzip=true",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["content-encoding"] == "gzip"
+    for line in response.text.splitlines():
+        assert set(json.loads(line)) == {"id", "title", "genre", "published_year", "author_id"}
+
+
+@pytest.mark.asyncio
+async def test_search_books_tolerates_typos(register_user_and_get_token):
+    token = await register_user_and_get_token
+    headers = {"Authorization": f"Bearer {token}"}
+    response = await AsyncClient().post(
+        "http://localhost:8000/book",
+        json={"title": "A Naval History of Britain", "genre": "History", "published_year": 2004, "author_id": 1},
+        headers=headers,
+    )
+    book_id = response.json()["id"]
+
+    response = await AsyncClient().get(
+        "http://localhost:8000/book/search?q=navl histroy", headers=headers
+    )
+    assert response.status_code == 200
+    results = response.json()
+    assert results[0]["id"] == book_id
+    assert results == sorted(results, key=lambda book: book["score"], reverse=True)
+
+
+@pytest.mark.asyncio
+async def test_full_text_search_returns_ranked_hits(register_user_and_get_token):
+    token = await register_user_and_get_token
+    response = await AsyncClient().get(
+        "http://localhost:8000/search/?q=naval history&limit=5",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 200
+    hits = response.json()
+    assert all(hit["kind"] in ("book", "author") for hit in hits)
+    assert [hit["rank"] for hit in hits] == sorted((hit["rank"] for hit in hits), reverse=True)
+
+
+@pytest.mark.asyncio
+async def test_full_text_search_ranks_title_above_biography(register_user_and_get_token):
+    token = await register_user_and_get_token
+    headers = {"Authorization": f"Bearer {token}"}
+    word = f"quokka{uuid.uuid4().hex[:8]}"
+    response = await AsyncClient().post(
+        "http://localhost:8000/author/",
+        json={"name": f"Ranked Author {word}x", "biography": f"Wrote about the {word} once"},
+        headers=headers,
+    )
+    author_id = response.json()["id"]
+    response = await AsyncClient().post(
+        "http://localhost:8000/book",
+        json={"title": f"The {word}", "genre": "Science", "published_year": 2010, "author_id": author_id},
+        headers=headers,
+    )
+    book_id = response.json()["id"]
+
+    response = await AsyncClient().get(
+        "http://localhost:8000/search/", params={"q": word}, headers=headers
+    )
+    assert response.status_code == 200
+    assert [(hit["kind"], hit["id"]) for hit in response.json()] == [
+        ("book", book_id),
+        ("author", author_id),
+    ]
+
+@pytest.mark.asyncio
+async def test_autocomplete_suggests_new_titles(register_user_and_get_token):
+    token = await register_user_and_get_token
+    headers = {"Authorization": f"Bearer {token}"}
+    response = await AsyncClient().post(
+        "http://localhost:8000/book",
+        json={"title": "Zanzibar Chronicles", "genre": "History", "published_year": 1999, "author_id": 1},
+        headers=headers,
+    )
+    book_id = response.json()["id"]
+
+    response = await AsyncClient().get(
+        "http://localhost:8000/book/autocomplete?q=zanzi&kind=book", headers=headers
+    )
+    assert response.status_code == 200
+    assert {"kind": "book", "id": book_id, "text": "Zanzibar Chronicles"} in response.json()
+
+
+@pytest.mark.asyncio
+async def test_get_books_exact_total_count(register_user_and_get_token):
+    token = await register_user_and_get_token
+    headers = {"Authorization": f"Bearer {token}"}
+    response = await AsyncClient().get(
+        "http://localhost:8000/book?count=exact&page_size=1", headers=headers
+    )
+    assert response.status_code == 200
+    total = int(response.headers["X-Total-Count"])
+    assert len(response.json()) == min(total, 1)
+
+    response = await AsyncClient().get(
+        "http://localhost:8000/book?count=estimate", headers=headers
+    )
+    assert int(response.headers["X-Total-Count"]) >= 0
+
+
+@pytest.mark.asyncio
+async def test_get_books_by_ids_keeps_order_and_reports_missing(register_user_and_get_token):
+    token = await register_user_and_get_token
+    headers = {"Authorization": f"Bearer {token}"}
+    book_ids = []
+    for title in ("Batch One", "Batch Two"):
+        response = await AsyncClient().post(
+            "http://localhost:8000/book",
+            json={"title": title, "genre": "Fiction", "published_year": 2001, "author_id": 1},
+            headers=headers,
+        )
+        book_ids.append(response.json()["id"])
+
+    ids = f"{book_ids[1]},999999,{book_ids[0]}"
+    response = await AsyncClient().get(f"http://localhost:8000/book/batch?ids={ids}", headers=headers)
+    assert response.status_code == 200
+    assert [book["id"] for book in response.json()["books"]] == [book_ids[1], book_ids[0]]
+    assert response.json()["missing"] == [999999]
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_and_delete_books(register_user_and_get_token):
+    token = await register_user_and_get_token
+    headers = {"Authorization": f"Bearer {token}"}
+    book_ids = []
+    for title in ("Bulk One", "Bulk Two"):
+        response = await AsyncClient().post(
+            "http://localhost:8000/book",
+            json={"title": title, "genre": "Fiction", "published_year": 2001, "author_id": 1},
+            headers=headers,
+        )
+        book_ids.append(response.json()["id"])
+
+    response = await AsyncClient().patch(
+        "http://localhost:8000/book/bulk",
+        json={"ids": book_ids, "changes": {"genre": "Science"}, "dry_run": True},
+        headers=headers,
+    )
+    assert response.json() == {"affected": 2, "dry_run": True}
+
+    response = await AsyncClient().patch(
+        "http://localhost:8000/book/bulk",
+        json={"ids": book_ids, "changes": {"genre": "Science"}},
+        headers=headers,
+    )
+    assert response.json() == {"affected": 2, "dry_run": False}
+    response = await AsyncClient().get(f"http://localhost:8000/book/{book_ids[0]}", headers=headers)
+    assert response.json()["genre"] == "Science"
+
+    response = await AsyncClient().post(
+        "http://localhost:8000/book/bulk/delete", json={"ids": book_ids}, headers=headers
+    )
+    assert response.json() == {"affected": 2, "dry_run": False}
+
+
+@pytest.mark.asyncio
+async def test_upsert_import_is_idempotent(register_user_and_get_token):
+    token = await register_user_and_get_token
+    csv_data = "title,genre,published_year,author_id\nUpsert Book,Fiction,2001,1\n"
+
+    async def run_import(data: str) -> dict:
+        response = await AsyncClient().post(
+            "http://localhost:8000/book/import",
+            params={"mode": "upsert"},
+            files={"file": ("books.csv", data, "text/csv")},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        assert response.status_code == 201
+        return response.json()
+
+    await run_import(csv_data)
+    report = await run_import(csv_data)
+    assert (report["rows_inserted"], report["rows_updated"], report["rows_skipped"]) == (0, 0, 1)
+
+    report = await run_import(csv_data.replace("Fiction", "History"))
+    assert (report["rows_inserted"], report["rows_updated"], report["rows_skipped"]) == (0, 1, 0)
+
+
+@pytest.mark.asyncio
+async def test_import_skips_invalid_rows(register_user_and_get_token):
+    token = await register_user_and_get_token
+    csv_data = (
+        "title,genre,published_year,author_id\n"
+        "Partial Book,Fiction,2001,1\n"
+        "Bad Genre Book,Poetry,2001,1\n"
+        "Old Book,History,1700,1\n"
+    )
+    response = await AsyncClient().post(
+        "http://localhost:8000/book/import",
+        params={"mode": "upsert", "on_error": "skip"},
+        files={"file": ("books.csv", csv_data, "text/csv")},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 201
+    report = response.json()
+    assert report["rows_rejected"] == 2
+    assert [reject["row"] for reject in report["rejects"]] == [2, 3]
+
+
+@pytest.mark.asyncio
+async def test_import_skip_rejects_each_row_once(register_user_and_get_token):
+    token = await register_user_and_get_token
+    title = f"Existing Book {uuid.uuid4().hex[:8]}"
+    header = "title,genre,published_year,author_id\n"
+
+    async def run_import(data: str) -> dict:
+        response = await AsyncClient().post(
+            "http://localhost:8000/book/import",
+            params={"on_error": "skip"},
+            files={"file": ("books.csv", header + data, "text/csv")},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        assert response.status_code == 201
+        return response.json()
+
+    await run_import(f"{title},Fiction,2001,1\n")
+    report = await run_import(
+        f"{title} Sequel,Fiction,2002,1\n"
+        f"{title},Fiction,2001,1\n"
+        f"{title} Orphan,Fiction,2003,2147483647\n"
+    )
+    assert (report["rows_inserted"], report["rows_rejected"]) == (1, 2)
+    assert [reject["row"] for reject in report["rejects"]] == [2, 3]
+
+
+@pytest.mark.asyncio
+async def test_import_creates_authors_by_name(register_user_and_get_token):
+    token = await register_user_and_get_token
+    author_name = f"Imported Author {uuid.uuid4().hex[:8]}"
+    csv_data = (
+        "title,genre,published_year,author_name\n"
+        f"Named Book One,Fiction,2001,{author_name}\n"
+        f"Named Book Two,History,2002,{author_name}\n"
+    )
+    response = await AsyncClient().post(
+        "http://localhost:8000/book/import",
+        params={"mode": "upsert"},
+        files={"file": ("books.csv", csv_data, "text/csv")},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 201
+    assert response.json()["rows_inserted"] == 2
+
+    response = await AsyncClient().get(
+        "http://localhost:8000/author/",
+        params={"name": author_name},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 200
+    assert [author["name"] for author in response.json()] == [author_name]
@@ -0,0 +1,71 @@
+"""
+Micro-benchmark of the per-row cost of serializing book pages.
+
+Compares the previous path (a BookResponseSchema built per row, then validated and
+serialized again through `response_model` and JSONResponse) with the direct
+row -> orjson path used by the book router.
+
+    python -m benchmarks.serialization_bench --rows 100 --repeat 2000
+"""
+import argparse
+import json
+import timeit
+from datetime import datetime, timezone
+from typing import Any, List
+
+from fastapi.responses import JSONResponse
+from fastapi.utils import create_model_field
+
+from app.api.routers.book_router import BOOK_RESPONSE_FIELDS
+from app.core.responses import rows_to_json
+from app.schemas.book_schemas import BookResponseSchema
+
+response_field = create_model_field(name="Response", type_=List[BookResponseSchema], mode="serialization")
+
+
+def make_rows(count: int) -> list[tuple[Any, ...]]:
+    updated_at = datetime.now(timezone.utc)
+    return [
+        (i, f"Book title {i}", "Fiction", 1900 + i % 120, i % 500 + 1, updated_at)
+        for i in range(1, count + 1)
+    ]
+
+
+def pydantic_path(rows: list[tuple[Any, ...]]) -> bytes:
+    books = [
+        BookResponseSchema(
+            id=book[0],
+            title=book[1],
+            genre=book[2],
+            published_year=book[3],
+            author_id=book[4],
+        )
+        for book in rows
+    ]
+    # What fastapi.routing.serialize_response does for a response_model, minus the coroutine.
+    value, errors = response_field.validate(books, {}, loc=("response",))
+    assert not errors
+    return JSONResponse(response_field.serialize(value, mode="json")).body
+
+
+def orjson_path(rows: list[tuple[Any, ...]]) -> bytes:
+    return rows_to_json(rows, BOOK_RESPONSE_FIELDS)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100, help="rows per page")
+    parser.add_argument("--repeat", type=int, default=2000, help="pages serialized per path")
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    assert json.loads(pydantic_path(rows)) == json.loads(orjson_path(rows)), "paths produce different JSON"
+
+    for name, func in (("pydantic + response_model", pydantic_path), ("rows -> orjson", orjson_path)):
+        seconds = min(timeit.repeat(lambda: func(rows), number=args.repeat, repeat=3))
+        per_row = seconds / (args.repeat * args.rows) * 1e6
+        print(f"{name:<28} {per_row:8.3f} us/row  {seconds / args.repeat * 1e3:8.3f} ms/page")
+
+
+if __name__ == "__main__":
+    main()
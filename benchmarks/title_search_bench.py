@@ -0,0 +1,103 @@
+"""
+Benchmark of title search at catalog scale: the `title ILIKE '%term%'` filter used by
+GET /book/ versus the pg_trgm word-similarity search behind GET /book/search.
+
+Builds a scratch table shaped like `book` with generated titles (1M rows by default),
+indexes it the way migrations 0001 and 0004 index `book`, and reports the median
+execution time of each query. Needs the pg_trgm extension and DATABASE_URL.
+
+    python -m benchmarks.title_search_bench --rows 1000000
+"""
+import argparse
+import asyncio
+import statistics
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import DATABASE_URL
+
+TABLE = "book_search_bench"
+WORDS = [
+    "naval", "history", "empire", "garden", "winter", "stone", "river", "shadow",
+    "science", "ocean", "silent", "golden", "kingdom", "machine", "letters", "journey",
+    "forest", "harbor", "storm", "atlas",
+]
+# Exact words, typos and partial words.
+TERMS = ["naval", "histroy", "kingdm", "golden river", "mach"]
+
+ILIKE_QUERY = f"""
+    SELECT id, title FROM {TABLE}
+    WHERE title ILIKE :pattern
+    ORDER BY title LIMIT 10
+"""
+TRGM_QUERY = f"""
+    SELECT id, title, word_similarity(:term, title) AS score FROM {TABLE}
+    WHERE :term <% title
+    ORDER BY score DESC, similarity(title, :term) DESC, id LIMIT 10
+"""
+
+
+async def populate(conn, rows: int) -> None:
+    await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    await conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+    await conn.execute(text(f"CREATE TABLE {TABLE} (id serial PRIMARY KEY, title varchar NOT NULL)"))
+    await conn.execute(
+        text(f"""
+            INSERT INTO {TABLE} (title)
+            SELECT initcap(w[1 + (random() * 19)::int] || ' ' || w[1 + (random() * 19)::int]
+                           || ' ' || w[1 + (random() * 19)::int]) || ' ' || g
+            FROM generate_series(1, :rows) AS g, (SELECT CAST(:words AS text[]) AS w) AS words
+        """),
+        {"rows": rows, "words": WORDS},
+    )
+    await conn.execute(text(f"CREATE INDEX ON {TABLE} (title, id)"))
+    await conn.execute(text(f"CREATE INDEX ON {TABLE} USING gin (title gin_trgm_ops)"))
+    await conn.execute(text(f"ANALYZE {TABLE}"))
+
+
+async def time_query(conn, query: str, params: dict, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        result = await conn.execute(text(f"EXPLAIN (ANALYZE, FORMAT JSON) {query}"), params)
+        timings.append(result.scalar()[0]["Execution Time"])
+    return statistics.median(timings)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=0.3)
+    parser.add_argument("--keep", action="store_true", help=f"keep the {TABLE} table afterwards")
+    args = parser.parse_args()
+
+    engine = create_async_engine(DATABASE_URL)
+    try:
+        async with engine.begin() as conn:
+            print(f"populating {TABLE} with {args.rows:,} rows...")
+            await populate(conn, args.rows)
+
+        async with engine.begin() as conn:
+            await conn.execute(
+                text("SELECT set_config('pg_trgm.word_similarity_threshold', :threshold, false)"),
+                {"threshold": str(args.threshold)},
+            )
+            print(f"{'term':<14} {'ILIKE ms':>10} {'trigram ms':>11} {'ILIKE hits':>11} {'trigram hits':>13}")
+            for term in TERMS:
+                ilike_params = {"pattern": f"%{term}%"}
+                trgm_params = {"term": term}
+                ilike_ms = await time_query(conn, ILIKE_QUERY, ilike_params, args.repeat)
+                trgm_ms = await time_query(conn, TRGM_QUERY, trgm_params, args.repeat)
+                ilike_hits = len((await conn.execute(text(ILIKE_QUERY), ilike_params)).fetchall())
+                trgm_hits = len((await conn.execute(text(TRGM_QUERY), trgm_params)).fetchall())
+                print(f"{term:<14} {ilike_ms:>10.2f} {trgm_ms:>11.2f} {ilike_hits:>11} {trgm_hits:>13}")
+
+            if not args.keep:
+                await conn.execute(text(f"DROP TABLE {TABLE}"))
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
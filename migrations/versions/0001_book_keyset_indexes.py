@@ -0,0 +1,30 @@
+"""book keyset pagination indexes
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_book_title_id", "book", ["title", "id"], if_not_exists=True)
+    op.create_index("ix_book_published_year_id", "book", ["published_year", "id"], if_not_exists=True)
+    op.create_index("ix_book_author_id_id", "book", ["author_id", "id"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_book_author_id_id", table_name="book", if_exists=True)
+    op.drop_index("ix_book_published_year_id", table_name="book", if_exists=True)
+    op.drop_index("ix_book_title_id", table_name="book", if_exists=True)
@@ -0,0 +1,57 @@
+"""full-text search vectors on book and author
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Stored generated columns are recomputed by Postgres on every INSERT, UPDATE and COPY,
+    # so regular writes and bulk imports keep them current without application code.
+    op.add_column(
+        "book",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed("setweight(to_tsvector('english', coalesce(title, '')), 'A')", persisted=True),
+        ),
+    )
+    op.add_column(
+        "author",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+                "setweight(to_tsvector('english', coalesce(biography, '')), 'B')",
+                persisted=True,
+            ),
+        ),
+    )
+    op.create_index(
+        "ix_book_search_vector", "book", ["search_vector"], postgresql_using="gin", if_not_exists=True
+    )
+    op.create_index(
+        "ix_author_search_vector", "author", ["search_vector"], postgresql_using="gin", if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_author_search_vector", table_name="author", if_exists=True)
+    op.drop_index("ix_book_search_vector", table_name="book", if_exists=True)
+    op.drop_column("author", "search_vector")
+    op.drop_column("book", "search_vector")
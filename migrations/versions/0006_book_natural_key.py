@@ -0,0 +1,82 @@
+"""unique natural key on book for idempotent imports
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Duplicate groups listed in the error raised when the upgrade finds duplicates.
+MAX_LISTED_DUPLICATES = 20
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+def upgrade() -> None:
+    # Re-run imports may already have created duplicates, which the unique index cannot be
+    # built over. Deleting user rows is opt-in: without `-x dedupe_books=true` the upgrade
+    # stops and lists them; with it, all but the oldest copy of each book are deleted.
+    bind = op.get_bind()
+    duplicates = bind.execute(sa.text("""
+        SELECT title, author_id, published_year, array_agg(id ORDER BY id) AS ids
+        FROM book
+        GROUP BY title, author_id, published_year
+        HAVING count(*) > 1
+        ORDER BY title, author_id, published_year
+    """)).fetchall()
+    if duplicates:
+        if context.get_x_argument(as_dictionary=True).get("dedupe_books", "").lower() != "true":
+            listed = "\n".join(
+                f"  title={row.title!r} author_id={row.author_id} "
+                f"published_year={row.published_year} ids={row.ids}"
+                for row in duplicates[:MAX_LISTED_DUPLICATES]
+            )
+            more = len(duplicates) - MAX_LISTED_DUPLICATES
+            raise RuntimeError(
+                f"{len(duplicates)} books share a title, author_id and published_year, so the "
+                f"unique natural key cannot be created:\n{listed}"
+                + (f"\n  ... and {more} more" if more > 0 else "")
+                + "\nResolve them, or re-run with `alembic -x dedupe_books=true upgrade head` "
+                "to keep the lowest id of each and delete the rest."
+            )
+        removed = bind.execute(sa.text("""
+            DELETE FROM book
+            WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, row_number() OVER (
+                        PARTITION BY title, author_id, published_year ORDER BY id
+                    ) AS copy
+                    FROM book
+                ) AS numbered
+                WHERE copy > 1
+            )
+        """)).rowcount
+        logger.warning(
+            "Deleted %d duplicate books in %d natural-key groups before creating uq_book_natural_key",
+            removed,
+            len(duplicates),
+        )
+    op.create_index(
+        "uq_book_natural_key",
+        "book",
+        ["title", "author_id", "published_year"],
+        unique=True,
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_book_natural_key", table_name="book", if_exists=True)
@@ -0,0 +1,34 @@
+"""used refresh token IDs for rotation reuse detection
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "used_refresh_token",
+        sa.Column("jti", sa.String(), primary_key=True),
+        sa.Column(
+            "user_id", sa.Integer(), sa.ForeignKey("user_data.id", ondelete="CASCADE"), nullable=False
+        ),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_used_refresh_token_expires_at", "used_refresh_token", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_table("used_refresh_token")
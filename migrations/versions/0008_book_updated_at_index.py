@@ -0,0 +1,25 @@
+"""index on book.updated_at for autocomplete catch-up scans
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_book_updated_at", "book", ["updated_at"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_book_updated_at", table_name="book", if_exists=True)